@@ -67,6 +67,13 @@ export interface GlobalStyle {
 
 export type AspectRatio = "16:9" | "9:16" | "1:1";
 export type VideoQuality = "draft" | "standard" | "high";
+export type EncoderPreset =
+  | "ultrafast"
+  | "superfast"
+  | "veryfast"
+  | "faster"
+  | "fast"
+  | "medium";
 
 export interface ExportSettings {
   resolution: [number, number];
@@ -74,6 +81,10 @@ export interface ExportSettings {
   aspectRatio: AspectRatio;
   format: "mp4";
   quality: VideoQuality;
+  /** libx264 preset; omitted picks one from `quality` */
+  encoderPreset?: EncoderPreset;
+  /** Fraction of `resolution` the shader is rendered at (0.25–1; draft caps it at 0.5) */
+  renderScale?: number;
 }
 
 export interface RenderSpec {
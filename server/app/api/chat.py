@@ -41,6 +41,9 @@ _LLM_ASKS_CONFIRM = re.compile(
     re.IGNORECASE,
 )
 
+# A fenced ```json ... ``` (or untagged) code block in an LLM response
+_JSON_FENCE = re.compile(r"```(?:json)?\s*\n(.*?)\n\s*```", re.DOTALL)
+
 
 def _build_analysis_context(job_id: str) -> str:
     """Build a context string from the job's analysis and lyrics data."""
@@ -127,7 +130,7 @@ def _detect_phase_transition(
 def _try_extract_render_spec(text: str) -> dict | None:
     """Try to extract a JSON render spec from an LLM response."""
     # Look for ```json ... ``` blocks
-    match = re.search(r"```(?:json)?\s*\n(.*?)\n\s*```", text, re.DOTALL)
+    match = _JSON_FENCE.search(text)
     if match:
         try:
             return json.loads(match.group(1))
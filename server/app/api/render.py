@@ -27,6 +27,7 @@ _VALID_TRANSITIONS = {
     "morph", "flash-white", "wipe", "zoom-in", "zoom-out",
 }
 _VALID_FPS = {24, 30, 60}
+_VALID_ENCODER_PRESETS = {"ultrafast", "superfast", "veryfast", "faster", "fast", "medium"}
 
 
 def _sanitize_render_spec(spec: dict) -> dict:
@@ -60,6 +61,18 @@ def _sanitize_render_spec(spec: dict) -> dict:
     es = spec.get("exportSettings") or spec.get("export_settings") or {}
     if es.get("fps") not in _VALID_FPS:
         es["fps"] = 30
+    for key in ("encoderPreset", "encoder_preset"):
+        if key in es and es[key] not in _VALID_ENCODER_PRESETS:
+            es.pop(key)
+
+    # Clamp render scale; drop null or non-numeric values so the default applies
+    for key in ("renderScale", "render_scale"):
+        if key not in es:
+            continue
+        if isinstance(es[key], (int, float)):
+            es[key] = max(0.25, min(1.0, float(es[key])))
+        else:
+            es.pop(key)
 
     return spec
 
@@ -1,10 +1,10 @@
-import asyncio
 import logging
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from app.services.llm_service import LLMService
+from app.services.shader_render_service import run_on_compile_thread
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -55,7 +55,7 @@ async def _generate_and_validate(
             status_code=500, detail="Shader generation failed",
         )
 
-    compile_err = await asyncio.to_thread(_try_compile, code)
+    compile_err = await run_on_compile_thread(_try_compile, code)
     if compile_err is None:
         logger.info("Shader compiled on first attempt")
         return code
@@ -75,7 +75,7 @@ async def _generate_and_validate(
         if not fixed:
             break
 
-        retry_err = await asyncio.to_thread(_try_compile, fixed)
+        retry_err = await run_on_compile_thread(_try_compile, fixed)
         if retry_err is None:
             logger.info(
                 "LLM fix compiled on retry %d", retry + 1,
@@ -97,7 +97,7 @@ async def _generate_and_validate(
         mood_tags=mood_tags,
     )
     if fresh:
-        fresh_err = await asyncio.to_thread(_try_compile, fresh)
+        fresh_err = await run_on_compile_thread(_try_compile, fresh)
         if fresh_err is None:
             logger.info("Fresh shader compiled successfully")
             return fresh
@@ -112,7 +112,7 @@ async def _generate_and_validate(
             description=description,
         )
         if final_fix:
-            final_err = await asyncio.to_thread(
+            final_err = await run_on_compile_thread(
                 _try_compile, final_fix,
             )
             if final_err is None:
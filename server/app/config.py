@@ -40,6 +40,22 @@ class Settings(BaseSettings):
     cors_origins: str = "http://localhost:5173"
     max_upload_size_mb: int = 50
     gemini_model: str = "gemini-2.5-flash-lite"
+    # Jobs kept in the in-memory job store; the least recently used idle
+    # ones are dropped past this.  0 keeps every job.
+    max_jobs: int = 1000
+
+    # Shader rendering
+    # Regex check for GLSL that NVIDIA rejects but Mesa accepts.  Skipped
+    # automatically when the server's own GL driver is NVIDIA.
+    nvidia_compat_check: bool = True
+    # H.264 encoder for shader renders: "libx264" (CPU), "h264_nvenc",
+    # "h264_qsv", "h264_videotoolbox", "h264_amf", or "auto" (first
+    # hardware encoder FFmpeg supports, else libx264)
+    video_encoder: str = "libx264"
+    # GPU time per frame (ms) that the raymarching fallback shaders are
+    # scaled down to fit; 0 always renders at full quality.  Needs a
+    # hardware GPU: software rasterizers (llvmpipe) can't time draws.
+    raymarch_frame_budget_ms: float = 0.0
 
     @property
     def cors_origin_list(self) -> list[str]:
@@ -30,6 +30,7 @@ TransitionType = Literal[
 LyricsAnimation = Literal["fade-word", "typewriter", "karaoke", "float-up", "none"]
 AspectRatio = Literal["16:9", "9:16", "1:1"]
 VideoQuality = Literal["draft", "standard", "high"]
+EncoderPreset = Literal["ultrafast", "superfast", "veryfast", "faster", "fast", "medium"]
 
 
 class LyricsDisplayConfig(BaseModel):
@@ -77,6 +78,11 @@ class ExportSettings(BaseModel):
     aspect_ratio: AspectRatio = "16:9"
     format: Literal["mp4"] = "mp4"
     quality: VideoQuality = "high"
+    # libx264 preset; None picks one from quality (faster for drafts)
+    encoder_preset: EncoderPreset | None = None
+    # Fraction of the output resolution the shader is rendered at; FFmpeg
+    # upscales.  Draft quality renders at no more than 0.5.
+    render_scale: float = Field(ge=0.25, le=1.0, default=1.0)
 
 
 class RenderSpec(BaseModel):
@@ -348,6 +348,9 @@ but CRASH on NVIDIA. NEVER use them:
   built-in. Use `hashFn` or `hash21` or `hash13` instead.
 - NEVER pass `void` as an argument: `foo(void)` is only valid \
   in declarations, not calls.
+- NEVER read `gl_FragCoord` — use the `fragCoord` argument of \
+  mainImage (pass it to helpers that need it). The video renderer \
+  shades rows top-down, so `gl_FragCoord.y` is flipped there.
 
 ## OUTPUT
 
@@ -379,6 +382,10 @@ _RE_VOID_MAIN = _re.compile(
     r"[^}]*\}",
     _re.DOTALL,
 )
+_RE_MAINIMAGE = _re.compile(
+    r"\bvoid\s+mainImage\s*\(([^)]*)\)\s*\{",
+)
+_RE_GL_FRAGCOORD = _re.compile(r"\bgl_FragCoord\b(?:\.([xy]{1,4})\b)?")
 # Double braces {{ or }} that the LLM may copy from prompt examples
 _RE_DOUBLE_BRACE_OPEN = _re.compile(r"\{\{")
 _RE_DOUBLE_BRACE_CLOSE = _re.compile(r"\}\}")
@@ -488,6 +495,47 @@ def _strip_void_expressions(code: str) -> str:
     return "\n".join(fixed)
 
 
+def _use_fragcoord_arg(code: str) -> str:
+    """Replace ``gl_FragCoord`` inside ``mainImage`` with its coord argument.
+
+    The server wrapper shades rows top-down and passes a flipped
+    ``fragCoord``, so only that argument matches the browser preview;
+    ``gl_FragCoord.y`` itself runs the other way.  ``.x``/``.y``
+    swizzles map onto the argument, and any other use keeps
+    ``gl_FragCoord.zw``.  Reads in helper functions are left alone.
+    """
+    m = _RE_MAINIMAGE.search(code)
+    if not m:
+        return code
+    params = m.group(1).split(",")
+    if len(params) != 2 or not params[1].split():
+        return code
+    coord = params[1].split()[-1]
+
+    # Find the end of the mainImage body
+    depth = 0
+    end = -1
+    for i in range(m.end() - 1, len(code)):
+        if code[i] == "{":
+            depth += 1
+        elif code[i] == "}":
+            depth -= 1
+            if depth == 0:
+                end = i
+                break
+    if end < 0:
+        return code
+
+    def repl(fm: _re.Match[str]) -> str:
+        swizzle = fm.group(1)
+        if swizzle is None:
+            return f"vec4({coord}, gl_FragCoord.zw)"
+        return coord if swizzle == "xy" else f"{coord}.{swizzle}"
+
+    body = _RE_GL_FRAGCOORD.sub(repl, code[m.end():end])
+    return code[:m.end()] + body + code[end:]
+
+
 def _rename_nvidia_reserved(code: str) -> str:
     """Rename user-defined functions that collide with NVIDIA built-ins.
 
@@ -547,6 +595,7 @@ def sanitize_shader_code(raw: str) -> str:
     - Wrapper void main() that the host already provides
     - ALL void-as-expression patterns (NVIDIA compat)
     - NVIDIA reserved name collisions (``hash`` → ``hashFn``)
+    - ``gl_FragCoord`` reads in ``mainImage`` (→ the ``fragCoord`` argument)
     - Double braces ``{{`` / ``}}``
     - Missing semicolons before function declarations
     - Stray backslash line continuations
@@ -585,6 +634,10 @@ def sanitize_shader_code(raw: str) -> str:
     code = _RE_DOUBLE_BRACE_OPEN.sub("{", code)
     code = _RE_DOUBLE_BRACE_CLOSE.sub("}", code)
 
+    # ── Use mainImage's fragCoord, not gl_FragCoord ─────────
+    # Needs balanced braces, so runs after the double-brace fix.
+    code = _use_fragcoord_arg(code)
+
     # ── Strip stray backslash line continuations ─────────────
     code = _re.sub(r"\\\n", "\n", code)
 
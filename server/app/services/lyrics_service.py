@@ -8,6 +8,9 @@ from app.models.lyrics import LyricsData, LyricsLine, LyricsMetadata, LyricsWord
 
 logger = logging.getLogger(__name__)
 
+# Trailing "Embed" / "123Embed" line that lyricsgenius appends
+_RE_EMBED_FOOTER = re.compile(r"^\d*Embed$")
+
 
 class LyricsService:
     """Fetches lyrics from external databases."""
@@ -82,7 +85,7 @@ class LyricsService:
             start_idx = 1
 
         # Remove trailing "Embed" or number
-        if lines_raw and re.match(r"^\d*Embed$", lines_raw[-1].strip()):
+        if lines_raw and _RE_EMBED_FOOTER.match(lines_raw[-1].strip()):
             lines_raw = lines_raw[:-1]
 
         lines: list[LyricsLine] = []
@@ -6,12 +6,21 @@ Output is piped as raw RGBA frames into FFmpeg for encoding.
 """
 
 import asyncio
+import contextlib
+import functools
 import logging
-import math
+import queue
+import re
+import string
 import struct
 import subprocess
+import sys
 import tempfile
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import IO, Any
 
 import numpy as np
 
@@ -21,7 +30,7 @@ except ImportError:
     moderngl = None  # type: ignore[assignment]
 
 from app.config import settings
-from app.models.render import RenderSpec
+from app.models.render import ExportSettings, RenderSpec
 
 logger = logging.getLogger(__name__)
 
@@ -34,30 +43,52 @@ void main() {
 }
 """
 
+# Fullscreen quad, drawn as a 4-vertex triangle strip
+_QUAD_VERTICES = struct.pack(
+    "<8f",
+    -1.0, -1.0,
+     1.0, -1.0,
+    -1.0,  1.0,
+     1.0,  1.0,
+)
+
 # Wrapper that turns Shadertoy-style mainImage into a proper fragment shader
-_FRAGMENT_WRAPPER = """\
+# ``string.Template`` rather than ``str.format`` so GLSL braces in the
+# wrapper need no escaping
+_FRAGMENT_WRAPPER = string.Template("""\
 #version 330
 precision highp float;
 
-uniform float iTime;
-uniform vec2 iResolution;
-uniform float u_bass;
-uniform float u_lowMid;
-uniform float u_mid;
-uniform float u_highMid;
-uniform float u_treble;
-uniform float u_energy;
-uniform float u_beat;
-uniform float u_spectralCentroid;
+// All per-frame inputs live in one block so the renderer updates them
+// with a single buffer write.  std140 layout: the vec2 sits at offset 0,
+// the floats follow tightly packed (see _AUDIO_BLOCK_FLOATS).
+layout(std140) uniform AudioUniforms {
+    vec2 iResolution;
+    float iTime;
+    float u_bass;
+    float u_lowMid;
+    float u_mid;
+    float u_highMid;
+    float u_treble;
+    float u_energy;
+    float u_beat;
+    float u_spectralCentroid;
+};
 
 out vec4 fragColor;
 
-{user_code}
+$user_code
 
-void main() {{
-    mainImage(fragColor, gl_FragCoord.xy);
-}}
-"""
+void main() {
+    // Shade row 0 as the top of the image so framebuffer reads come out
+    // in FFmpeg's top-down row order; mainImage still sees Shadertoy's
+    // bottom-left origin.
+    mainImage(fragColor, vec2(gl_FragCoord.x, iResolution.y - gl_FragCoord.y));
+}
+""")
+
+# Size of the AudioUniforms block in floats: 10 members padded to 16 bytes
+_AUDIO_BLOCK_FLOATS = 12
 
 # ── Curated fallback shaders ──────────────────────────────────────────
 # Each is pre-tested to compile under #version 330 with the fragment
@@ -189,6 +220,10 @@ void mainImage(out vec4 fragColor, in vec2 fragCoord) {
 """
 
 _FALLBACK_SPHERE = """\
+// Raymarch step cap; lowered by the renderer on hosts that miss the
+// frame budget (see ``_calibrate_max_steps``)
+uniform int u_maxSteps = 80;
+
 vec3 palette(float t, vec3 a, vec3 b, vec3 c, vec3 d) {
     return a + b * cos(6.28318 * (c * t + d));
 }
@@ -221,7 +256,7 @@ void mainImage(out vec4 fragColor, in vec2 fragCoord) {
     vec3 up = cross(right, fwd);
     vec3 rd = normalize(fwd * 1.5 + right * uv.x + up * uv.y);
     float t = 0.0;
-    for (int i = 0; i < 80; i++) {
+    for (int i = 0; i < u_maxSteps; i++) {
         float d = scene(ro + rd * t);
         if (d < 0.001) break;
         t += d;
@@ -260,6 +295,14 @@ _FALLBACK_LIBRARY: list[tuple[list[str], str]] = [
     ([], _FALLBACK_PLASMA),  # default
 ]
 
+# One precompiled keyword alternation per category (substring match,
+# same as ``kw in description``), in library order
+_FALLBACK_PATTERNS: list[tuple[re.Pattern[str], str]] = [
+    (re.compile("|".join(map(re.escape, keywords))), shader)
+    for keywords, shader in _FALLBACK_LIBRARY
+    if keywords
+]
+
 # Keep a simple default alias for the client-side fallback import
 _FALLBACK_SHADER = _FALLBACK_PLASMA
 
@@ -267,10 +310,8 @@ _FALLBACK_SHADER = _FALLBACK_PLASMA
 def pick_fallback_shader(description: str = "") -> str:
     """Pick a curated fallback shader based on description keywords."""
     desc_lower = description.lower()
-    for keywords, shader in _FALLBACK_LIBRARY:
-        if not keywords:
-            continue
-        if any(kw in desc_lower for kw in keywords):
+    for pattern, shader in _FALLBACK_PATTERNS:
+        if pattern.search(desc_lower):
             return shader
     # Rotate through fallbacks based on hash of description
     # so different descriptions get different visuals
@@ -278,56 +319,553 @@ def pick_fallback_shader(description: str = "") -> str:
     return _FALLBACK_LIBRARY[idx][1]
 
 
-def _interpolate(times: list[float], values: list[float], t: float) -> float:
-    """Linear interpolation of a value at time t from arrays of timestamps and values."""
-    if not times or not values:
-        return 0.0
-    if t <= times[0]:
-        return values[0]
-    if t >= times[-1]:
-        return values[-1]
-
-    # Binary search for the bracket
-    lo, hi = 0, len(times) - 1
-    while lo < hi - 1:
-        mid = (lo + hi) // 2
-        if times[mid] <= t:
-            lo = mid
-        else:
-            hi = mid
-
-    span = times[hi] - times[lo]
-    if span <= 0:
-        return values[lo]
-    frac = (t - times[lo]) / span
-    return values[lo] + frac * (values[hi] - values[lo])
-
-
-def _compute_beat_intensity(beat_times: list[float], t: float, decay: float = 0.15) -> float:
-    """Compute beat intensity at time t: 1.0 on beat, exponential decay after."""
+def _sample_series(
+    times: list[float], values: list[float], frame_times: np.ndarray,
+) -> np.ndarray:
+    """Linearly interpolate a feature timeseries at every frame timestamp.
+
+    One ``np.interp`` call covers all frames, with no Python loop.
+    Values are held constant outside the sampled range; mismatched
+    lengths are truncated to the shorter series.  The result is
+    float32, the precision the shader uniforms are uploaded at.
+    """
+    n = min(len(times), len(values))
+    if n == 0:
+        return np.zeros(len(frame_times), dtype=np.float32)
+    return np.asarray(np.interp(
+        frame_times,
+        np.asarray(times[:n], dtype=np.float64),
+        np.asarray(values[:n], dtype=np.float64),
+    ), dtype=np.float32)
+
+
+def _beat_envelope(
+    beat_times: list[float], frame_times: np.ndarray, decay: float = 0.15,
+) -> np.ndarray:
+    """Beat intensity at every frame timestamp: 1.0 on a beat, decaying after.
+
+    Each frame gets ``exp(-dt / decay)``, where ``dt`` is the time since
+    the last beat at or before it, found for all frames with a single
+    ``searchsorted``.  Frames before the first beat get 0.0.
+    """
     if not beat_times:
-        return 0.0
+        return np.zeros(len(frame_times), dtype=np.float32)
+
+    beats = np.sort(np.asarray(beat_times, dtype=np.float64))
+    idx = np.searchsorted(beats, frame_times, side="right") - 1
+    dt = np.where(
+        idx < 0, np.inf, frame_times - beats[np.clip(idx, 0, None)],
+    )
+    return np.exp(-dt / decay).astype(np.float32)
+
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_encoders() -> frozenset[str]:
+    """Names of the video encoders the local FFmpeg build provides.
+
+    Probed once per process with ``ffmpeg -encoders``.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning("Could not probe FFmpeg encoders: %s", e)
+        return frozenset()
+    # Encoder lines look like " V....D h264_nvenc   NVIDIA NVENC H.264 encoder"
+    return frozenset(
+        parts[1] for line in result.stdout.splitlines()
+        if len(parts := line.split()) >= 2 and parts[0].startswith("V")
+    )
+
+
+# Hardware H.264 encoders in ``VIDEO_ENCODER=auto`` preference order,
+# each tuned for roughly libx264 -crf 21 quality.  QSV only takes NV12
+# input; the others accept yuv420p directly.
+_HW_ENCODER_ARGS: dict[str, list[str]] = {
+    "h264_nvenc": [
+        "-c:v", "h264_nvenc",
+        "-preset", "p4",
+        "-tune", "hq",
+        "-rc:v", "vbr",
+        "-cq", "23",
+        "-b:v", "0",
+        "-maxrate", "20M",
+        "-bufsize", "40M",
+        "-pix_fmt", "yuv420p",
+    ],
+    "h264_qsv": [
+        "-c:v", "h264_qsv",
+        "-preset", "medium",
+        "-global_quality", "23",
+        "-pix_fmt", "nv12",
+    ],
+    "h264_videotoolbox": [
+        "-c:v", "h264_videotoolbox",
+        "-q:v", "65",
+        "-pix_fmt", "yuv420p",
+    ],
+    "h264_amf": [
+        "-c:v", "h264_amf",
+        "-quality", "balanced",
+        "-rc", "cqp",
+        "-qp_i", "21",
+        "-qp_p", "23",
+        "-pix_fmt", "yuv420p",
+    ],
+}
+
+
+@functools.cache
+def _encoder_works(name: str) -> bool:
+    """Whether a one-frame trial encode with hardware encoder *name* succeeds.
+
+    ``ffmpeg -encoders`` lists every encoder the build was compiled
+    with, even when the driver or device it needs is missing, so a
+    listed encoder can still fail at render time.  Tried once per
+    encoder per process.
+    """
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.04",
+        "-frames:v", "1",
+        *_HW_ENCODER_ARGS[name],
+        "-f", "null", "-",
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning("Trial %s encode failed: %s", name, e)
+        return False
+    if result.returncode != 0:
+        logger.warning(
+            "FFmpeg lists %s but a trial encode failed: %s",
+            name, result.stderr.strip()[-300:],
+        )
+        return False
+    return True
+
+
+def _video_codec_args(preset: str) -> list[str]:
+    """FFmpeg video encoder (and output pixel format) arguments.
+
+    ``VIDEO_ENCODER`` names one of the hardware encoders above to move
+    H.264 encoding off the CPU, or ``auto`` to take the first one
+    available.  A hardware encoder is used only if FFmpeg lists it and
+    a trial encode passes.  Anything else (or an encoder that fails
+    either check) uses libx264 with the given preset; libx264 itself
+    never probes FFmpeg.
+    """
+    encoder = settings.video_encoder
+    if encoder == "auto":
+        available = _ffmpeg_encoders()
+        encoder = next(
+            (
+                name for name in _HW_ENCODER_ARGS
+                if name in available and _encoder_works(name)
+            ),
+            "libx264",
+        )
+    if encoder in _HW_ENCODER_ARGS:
+        if encoder in _ffmpeg_encoders() and _encoder_works(encoder):
+            return list(_HW_ENCODER_ARGS[encoder])
+        logger.warning("FFmpeg can't use the %s encoder, falling back to libx264", encoder)
+    elif encoder != "libx264":
+        logger.warning("Unknown video encoder %r, falling back to libx264", encoder)
+    return [
+        "-c:v", "libx264",
+        "-preset", preset,
+        "-crf", "21",
+        "-threads", "0",
+        "-pix_fmt", "yuv420p",
+    ]
+
+
+# Draft renders (quick previews while iterating on edits) shade at no
+# more than this fraction of the output size in each dimension
+_DRAFT_RENDER_SCALE = 0.5
+
+
+def _shaded_resolution(export_settings: ExportSettings) -> tuple[int, int]:
+    """Size the shader is rendered at before FFmpeg scales to the output.
+
+    Fragment work is O(width * height), so shading at ``render_scale``
+    of the output and upscaling once while encoding saves most of the
+    GPU time.  Draft quality caps the scale at ``_DRAFT_RENDER_SCALE``.
+    """
+    out_width, out_height = export_settings.resolution
+    scale = export_settings.render_scale
+    if export_settings.quality == "draft":
+        scale = min(scale, _DRAFT_RENDER_SCALE)
+    return max(2, round(out_width * scale)), max(2, round(out_height * scale))
+
+
+# libx264 preset per quality when the spec doesn't name one.  Shader
+# output is clean synthetic imagery, so the fast presets lose little.
+_QUALITY_PRESETS = {"draft": "ultrafast", "standard": "superfast", "high": "veryfast"}
+
+
+def _encoder_preset(export_settings: ExportSettings) -> str:
+    """The explicit ``encoder_preset``, else the default for the quality."""
+    return export_settings.encoder_preset or _QUALITY_PRESETS[export_settings.quality]
+
+
+_PIPE_BUFFER_BYTES = 1 << 20
+
+
+def _grow_pipe(stream: IO[bytes]) -> None:
+    """Raise the kernel buffer of a pipe to 1 MiB (Linux only, best effort)."""
+    try:
+        import fcntl
+
+        fcntl.fcntl(stream.fileno(), fcntl.F_SETPIPE_SZ, _PIPE_BUFFER_BYTES)
+    except (ImportError, AttributeError, OSError) as e:
+        logger.debug("Could not resize FFmpeg stdin pipe: %s", e)
+
+
+class _FrameWriter:
+    """Feeds rendered frames to FFmpeg's stdin from a background thread.
+
+    The writer owns a small pool of ``buffer_bytes`` buffers: the render
+    loop fills one (possibly with several frames) from ``acquire()``,
+    passes it to ``submit()`` and moves on to the next draw while this
+    thread blocks on the pipe, then hands the buffer back once written,
+    so no per-frame allocations happen on the hot path.  The pool is
+    bounded, so a slow encoder applies backpressure instead of letting
+    frames pile up in memory.
+    """
+
+    def __init__(self, stream: IO[bytes], buffer_bytes: int, max_pending: int = 4) -> None:
+        self._stream = stream
+        # (buffer, bytes to write) per submit; None stops the thread
+        self._queue: queue.Queue[tuple[np.ndarray, int] | None] = queue.Queue(
+            maxsize=max_pending,
+        )
+        self._free: queue.Queue[np.ndarray] = queue.Queue()
+        for _ in range(max_pending):
+            self._free.put(np.empty(buffer_bytes, dtype=np.uint8))
+        self.error: Exception | None = None
+        self._thread = threading.Thread(
+            target=self._run, name="ffmpeg-frame-writer", daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            buf, nbytes = item
+            if self.error is None:
+                try:
+                    self._stream.write(buf[:nbytes].data)
+                except Exception as e:
+                    self.error = e
+            # On error keep draining (and recycling) so the producer never blocks
+            self._free.put(buf)
+
+    def acquire(self) -> np.ndarray:
+        """Take a free pooled buffer, waiting for one if all are in flight."""
+        return self._free.get()
+
+    def submit(self, buf: np.ndarray, nbytes: int | None = None) -> None:
+        """Queue the first ``nbytes`` of a buffer from ``acquire()``.
+
+        The buffer returns to the pool once written.  Re-raises a pipe
+        error from an earlier write.
+        """
+        if self.error is not None:
+            self._free.put(buf)
+            raise self.error
+        self._queue.put((buf, buf.nbytes if nbytes is None else nbytes))
+
+    def close(self) -> None:
+        """Flush queued frames and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class _FFmpegEncode:
+    """An FFmpeg process encoding the raw frames a ``_FrameWriter`` feeds it.
+
+    The render thread queues frames on ``writer``; ``finish()`` then
+    waits out the encode without touching GL, so it runs off the render
+    thread and the next render can start meanwhile.
+    """
+
+    def __init__(
+        self, cmd: list[str], output_path: Path, buffer_bytes: int,
+        timeout: int, render_id: str,
+    ) -> None:
+        self.output_path = output_path
+        self._timeout = timeout
+        self._render_id = render_id
+        # Write FFmpeg stderr to a temp file instead of a pipe to avoid the
+        # classic subprocess deadlock: if the 64KB pipe buffer fills (FFmpeg
+        # writes lots of progress/stats), FFmpeg blocks on stderr writes and
+        # can never finish reading stdin → everything hangs.
+        self._stderr_file = tempfile.NamedTemporaryFile(
+            mode="w+b", suffix=".log", delete=False,
+        )
+        self._stderr_path = Path(self._stderr_file.name)
+        try:
+            # Each frame is width*height*4 bytes; a 1 MiB stdin buffer and
+            # kernel pipe keep the write syscall count per frame low.
+            self._proc: subprocess.Popen[bytes] = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=self._stderr_file,
+                bufsize=_PIPE_BUFFER_BYTES,
+            )
+        except BaseException:
+            self._remove_log()
+            raise
+        try:
+            assert self._proc.stdin is not None  # stdin=PIPE
+            self._stdin: IO[bytes] = self._proc.stdin
+            _grow_pipe(self._stdin)
+            self.writer = _FrameWriter(self._stdin, buffer_bytes=buffer_bytes)
+        except BaseException:
+            self._proc.kill()
+            self._proc.wait()
+            self._remove_log()
+            raise
+
+    def _remove_log(self) -> None:
+        self._stderr_file.close()
+        self._stderr_path.unlink(missing_ok=True)
+
+    def _close_stdin(self) -> None:
+        # Let the writer drain, then close FFmpeg stdin to signal
+        # end-of-stream.  FFmpeg may already have exited; that is
+        # reported via its returncode.
+        self.writer.close()
+        with contextlib.suppress(BrokenPipeError):
+            self._stdin.close()
+
+    def finish(self) -> None:
+        """Flush the queued frames and wait for FFmpeg to finish the file.
+
+        Raises ``RuntimeError`` if FFmpeg fails or times out, or a frame
+        could not be written.
+        """
+        self._close_stdin()
+        try:
+            self._proc.wait(timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            logger.error(
+                "FFmpeg timed out after %ds for render %s, killing",
+                self._timeout, self._render_id,
+            )
+            self._proc.kill()
+            self._proc.wait(timeout=10)
+            self._remove_log()
+            raise RuntimeError(
+                f"FFmpeg encoding timed out after {self._timeout}s"
+            )
+
+        if self._proc.returncode != 0 or self.writer.error is not None:
+            self._stderr_file.close()
+            stderr_tail = self._stderr_path.read_text(errors="replace")[-500:]
+            logger.error("FFmpeg failed: %s", stderr_tail)
+            self._remove_log()
+            raise RuntimeError(f"FFmpeg encoding failed (rc={self._proc.returncode})")
+
+        self._remove_log()
+
+    def abort(self) -> None:
+        """Kill FFmpeg after a failed render; the partial output is discarded."""
+        self._proc.kill()
+        self._close_stdin()
+        self._proc.wait()
+        self._remove_log()
+        self.output_path.unlink(missing_ok=True)
+
+
+# Adaptive raymarch quality: shaders that declare ``uniform int
+# u_maxSteps`` get their step cap scaled to the frame budget after a few
+# timed warm-up draws, then frozen for the whole render.  Only the
+# built-in fallbacks declare it (LLM shaders must also run in the WebGL
+# 1.0 preview, which has no uniform initializers), and it only takes
+# effect on hardware GPUs: see ``_calibrate_max_steps``.
+_CALIBRATION_FRAMES = 8
+_MIN_RAYMARCH_STEPS = 30
+# Software rasterizers defer shading past the timed draw, so their timer
+# queries don't measure it
+_SOFTWARE_RENDERERS = ("llvmpipe", "softpipe", "swiftshader", "software rasterizer")
+# Drivers report this (or 0) when a query recorded no time
+_QUERY_INVALID_NS = 0xFFFFFFFF
+
+
+def _calibrate_max_steps(
+    ctx: "moderngl.Context", vao: "moderngl.VertexArray",
+    u_max_steps: "moderngl.Uniform", budget_ms: float,
+) -> int | None:
+    """Time warm-up draws at the shader's default step cap and scale it to fit ``budget_ms``.
+
+    Returns None when the driver's timer queries can't be trusted
+    (software rasterizer, or a sample with no recorded time).
+    """
+    renderer = str(ctx.info.get("GL_RENDERER", "")).lower()
+    if any(name in renderer for name in _SOFTWARE_RENDERERS):
+        return None
+
+    max_steps = int(u_max_steps.value)
+    query = ctx.query(time=True)
+    samples = []
+    for _ in range(_CALIBRATION_FRAMES):
+        with query:
+            vao.render(moderngl.TRIANGLE_STRIP, vertices=4)
+        elapsed = query.elapsed
+        if elapsed <= 0 or elapsed >= _QUERY_INVALID_NS:
+            return None
+        samples.append(elapsed / 1e6)  # ns -> ms
+
+    frame_ms = sorted(samples)[len(samples) // 2]
+    if frame_ms <= budget_ms:
+        return max_steps
+    return max(_MIN_RAYMARCH_STEPS, min(max_steps, int(max_steps * budget_ms / frame_ms)))
+
 
-    # Find closest beat at or before t
-    best_dt = float("inf")
-    for bt in beat_times:
-        dt = t - bt
-        if 0 <= dt < best_dt:
-            best_dt = dt
+# ── Regex patterns for the NVIDIA static check ───────────────────────
+# Compiled once at import; the check re-runs on every compile retry.
+_RE_VOID_CALL = re.compile(r"\bvoid\s*\(")
+_RE_VOID_DECL = re.compile(r"^void\s+\w+\s*\(")
+_RE_RETURN_VOID = re.compile(r"\breturn\s+void\b")
+_RE_FUNC_VOID = re.compile(r"\w+\s*\(\s*void\s*\)")
+_RE_TYPE_FUNC_VOID = re.compile(
+    r"^(?:void|float|int|vec[234]|mat[234]|bool|"
+    r"ivec[234])\s+\w+\s*\(\s*void\s*\)",
+)
+_RE_HASH_DECL = re.compile(r"\b(?:float|vec[234]|int)\s+hash\s*\(")
 
-    if best_dt == float("inf"):
-        return 0.0
 
-    return math.exp(-best_dt / decay)
+# GL work runs on two dedicated threads, each owning one context (an
+# EGL context can only be current on one thread at a time).  Compile
+# checks get their own thread so shader validation never queues behind
+# a video render, which can take minutes; renders run one at a time on
+# the other.
+_COMPILE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shader-compile")
+_RENDER_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shader-render")
+
+
+async def run_on_compile_thread(func: Callable[..., Any], *args: Any) -> Any:
+    """Run ``func(*args)`` on the GL compile-check thread and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_COMPILE_EXECUTOR, func, *args)
+
+
+async def run_on_render_thread(func: Callable[..., Any], *args: Any) -> Any:
+    """Run ``func(*args)`` on the GL render thread and await the result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_RENDER_EXECUTOR, func, *args)
 
 
 class ShaderRenderService:
     """Renders GLSL shader video server-side using ModernGL headless context."""
 
+    # Long-lived GL state, one set per GL thread (the compile and the
+    # render thread).  Creating a standalone context costs tens to
+    # hundreds of ms, so it is created lazily and reused by every job
+    # that runs on the thread.
+    _gl_local = threading.local()
+
+    # Framebuffers kept per context, keyed by resolution
+    _FBO_CACHE_SIZE = 4
+
+    # Compiled programs kept per context, keyed by fragment source
+    _PROGRAM_CACHE_SIZE = 16
+
+    # GL_VENDOR of the contexts, recorded when the first one is created
+    _gl_vendor: str = ""
+
     def __init__(self) -> None:
         if moderngl is None:
             raise RuntimeError("moderngl is not installed")
 
+    @classmethod
+    def _get_ctx(cls) -> "moderngl.Context":
+        """Return this thread's GL context, creating it on first use.
+
+        Only call this on the compile or the render thread.
+        """
+        ctx = getattr(cls._gl_local, "ctx", None)
+        if ctx is None:
+            # EGL is Linux-only; on Windows WGL is used automatically; on macOS CGL.
+            backend_kwargs: dict = {}
+            if sys.platform.startswith("linux"):
+                backend_kwargs["backend"] = "egl"
+            ctx = moderngl.create_standalone_context(**backend_kwargs)
+            cls._gl_local.ctx = ctx
+            cls._gl_local.fbos = {}
+            cls._gl_local.programs = {}
+            if not cls._gl_vendor:
+                cls._gl_vendor = ctx.info.get("GL_VENDOR", "")
+                logger.info(
+                    "GL context: %s / %s",
+                    cls._gl_vendor, ctx.info.get("GL_RENDERER", ""),
+                )
+        return ctx
+
+    @classmethod
+    def _needs_nvidia_static_check(cls) -> bool:
+        """Whether ``_try_compile`` should run ``_nvidia_static_check``.
+
+        The check exists because Mesa accepts GLSL that NVIDIA rejects.
+        When the render context itself is NVIDIA, the real compile
+        already enforces those rules, so the regex pass is skipped.
+        ``NVIDIA_COMPAT_CHECK=false`` turns it off everywhere.
+        """
+        if not settings.nvidia_compat_check:
+            return False
+        return "nvidia" not in cls._gl_vendor.lower()
+
+    @classmethod
+    def _get_fbo(
+        cls, ctx: "moderngl.Context", width: int, height: int,
+    ) -> "moderngl.Framebuffer":
+        """Return a cached RGBA framebuffer for this resolution.
+
+        The least recently created framebuffer and its texture are
+        released once the cache is full.
+        """
+        fbos: dict[tuple[int, int], moderngl.Framebuffer] = cls._gl_local.fbos
+        fbo = fbos.get((width, height))
+        if fbo is None:
+            fbo = ctx.framebuffer(
+                color_attachments=[ctx.texture((width, height), 4)],
+            )
+            if len(fbos) >= cls._FBO_CACHE_SIZE:
+                old = fbos.pop(next(iter(fbos)))
+                for attachment in old.color_attachments:
+                    attachment.release()
+                old.release()
+            fbos[(width, height)] = fbo
+        return fbo
+
+    @classmethod
+    def _get_program(
+        cls, ctx: "moderngl.Context", frag_src: str,
+    ) -> "moderngl.Program":
+        """Return a cached program for this fragment source, compiling on a miss.
+
+        Compile errors propagate and are not cached.  The least recently
+        compiled program is released once the cache is full.
+        """
+        programs: dict[str, moderngl.Program] = cls._gl_local.programs
+        prog = programs.get(frag_src)
+        if prog is None:
+            prog = ctx.program(
+                vertex_shader=_VERTEX_SHADER,
+                fragment_shader=frag_src,
+            )
+            if len(programs) >= cls._PROGRAM_CACHE_SIZE:
+                programs.pop(next(iter(programs))).release()
+            programs[frag_src] = prog
+        return prog
+
     @staticmethod
     def _nvidia_static_check(shader_code: str) -> str | None:
         """Catch GLSL patterns that NVIDIA rejects but Mesa accepts.
@@ -337,28 +875,27 @@ class ShaderRenderService:
         so we can sanitize proactively on Mesa/EGL servers whose
         compiler is too lenient.
         """
-        import re as _re
-
-        lines = shader_code.split("\n")
-        for i, line in enumerate(lines, 1):
+        for i, line in enumerate(shader_code.splitlines(), 1):
             stripped = line.strip()
 
-            # Skip comments
-            if stripped.startswith("//"):
+            # Skip comments.  Every per-line rule involves `void`, which
+            # most shaders only use in a few signatures, so a substring
+            # test lets the regexes run on just those lines.
+            if stripped.startswith("//") or "void" not in stripped:
                 continue
 
             # ── void(...) as expression (not a declaration) ──────
             # Valid declaration: `void funcName(...)`
             # Invalid expression: `void(...)` or `void();`
-            if _re.search(r"\bvoid\s*\(", stripped):
-                if not _re.match(r"^void\s+\w+\s*\(", stripped):
+            if _RE_VOID_CALL.search(stripped):
+                if not _RE_VOID_DECL.match(stripped):
                     return (
                         f"NVIDIA compat: line {i}: "
                         f"void() expression is invalid — {stripped}"
                     )
 
             # ── return void ─────────────────────────────────────
-            if _re.search(r"\breturn\s+void\b", stripped):
+            if _RE_RETURN_VOID.search(stripped):
                 return (
                     f"NVIDIA compat: line {i}: "
                     f"return void is invalid — {stripped}"
@@ -367,13 +904,9 @@ class ShaderRenderService:
             # ── func(void) in a call ────────────────────────────
             # Valid declaration: `float foo(void) {`
             # Invalid call: `x = foo(void);`
-            if _re.search(r"\w+\s*\(\s*void\s*\)", stripped):
+            if _RE_FUNC_VOID.search(stripped):
                 # Check if it's a declaration (has a type before the name)
-                if not _re.match(
-                    r"^(?:void|float|int|vec[234]|mat[234]|bool|"
-                    r"ivec[234])\s+\w+\s*\(\s*void\s*\)",
-                    stripped,
-                ):
+                if not _RE_TYPE_FUNC_VOID.match(stripped):
                     return (
                         f"NVIDIA compat: line {i}: "
                         f"func(void) call syntax is invalid "
@@ -381,9 +914,7 @@ class ShaderRenderService:
                     )
 
         # ── Reserved function names on NVIDIA ────────────────
-        if _re.search(
-            r"\b(?:float|vec[234]|int)\s+hash\s*\(", shader_code,
-        ):
+        if _RE_HASH_DECL.search(shader_code):
             return (
                 "NVIDIA compat: function 'hash' collides with "
                 "NVIDIA built-in — rename to 'hashFn'"
@@ -393,10 +924,11 @@ class ShaderRenderService:
 
     @staticmethod
     def _try_compile(shader_code: str) -> str | None:
-        """Try compiling shader_code in a temporary GL context.
+        """Try compiling shader_code in the thread's shared GL context.
 
         Runs NVIDIA static analysis first (catches patterns Mesa
-        accepts but NVIDIA rejects), then compiles with ModernGL.
+        accepts but NVIDIA rejects) unless the GL driver is NVIDIA
+        itself, then compiles with ModernGL.
         Returns None on success, or the error message string on
         failure.
         """
@@ -408,30 +940,35 @@ class ShaderRenderService:
         shader_code = sanitize_shader_code(shader_code)
 
         # Static check for NVIDIA-incompatible patterns
-        nvidia_err = ShaderRenderService._nvidia_static_check(
-            shader_code,
-        )
-        if nvidia_err:
-            return nvidia_err
-
-        import sys
-        _kw: dict = {}
-        if sys.platform.startswith("linux"):
-            _kw["backend"] = "egl"
-        ctx = moderngl.create_standalone_context(**_kw)
-        try:
-            frag_src = _FRAGMENT_WRAPPER.format(
-                user_code=shader_code,
+        if ShaderRenderService._needs_nvidia_static_check():
+            nvidia_err = ShaderRenderService._nvidia_static_check(
+                shader_code,
             )
-            ctx.program(
-                vertex_shader=_VERTEX_SHADER,
-                fragment_shader=frag_src,
+            if nvidia_err:
+                return nvidia_err
+
+        return ShaderRenderService._gl_compile_error(shader_code)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _gl_compile_error(shader_code: str) -> str | None:
+        """Compile sanitized *shader_code* and return the error, if any.
+
+        Memoized so the fix-retry loops and repeat renders of the same
+        shader (including the fallbacks) skip the GL compile.  The
+        result only depends on the code and the driver; a failure to
+        create the context raises and is not cached.  A program that
+        compiles stays in this context's program cache rather than
+        being released, so it is not compiled again on this thread.
+        """
+        ctx = ShaderRenderService._get_ctx()
+        try:
+            ShaderRenderService._get_program(
+                ctx, _FRAGMENT_WRAPPER.substitute(user_code=shader_code),
             )
-            return None
         except Exception as e:
             return str(e)
-        finally:
-            ctx.release()
+        return None
 
     async def render_shader_video(
         self,
@@ -445,9 +982,11 @@ class ShaderRenderService:
 
         Validates the shader first.  If compilation fails, asks the LLM
         to fix it (up to 3 retries).  Falls back to a curated shader on
-        total failure.  The heavy GL + FFmpeg work runs in a thread.
+        total failure.  Compile checks run on the compile thread and the
+        frame rendering on the render thread; the encode is then waited
+        out on a worker thread so the render thread is free meanwhile.
         """
-        compile_err = await asyncio.to_thread(
+        compile_err = await run_on_compile_thread(
             self._try_compile, shader_code,
         )
         if compile_err:
@@ -471,7 +1010,7 @@ class ShaderRenderService:
                 )
                 if not fixed:
                     break
-                retry_err = await asyncio.to_thread(
+                retry_err = await run_on_compile_thread(
                     self._try_compile, fixed,
                 )
                 if retry_err is None:
@@ -495,31 +1034,43 @@ class ShaderRenderService:
                 )
                 shader_code = pick_fallback_shader(desc)
 
-        return await asyncio.to_thread(
-            self._render_blocking,
+        encode = await run_on_render_thread(
+            self._render_frames,
             render_id, audio_path, analysis, render_spec, shader_code,
         )
+        await asyncio.to_thread(encode.finish)
+
+        download_url = f"/storage/renders/{render_id}.mp4"
+        logger.info("Shader render complete: %s → %s", render_id, download_url)
+
+        return {"download_url": download_url, "output_path": str(encode.output_path)}
 
-    def _render_blocking(
+    def _render_frames(
         self,
         render_id: str,
         audio_path: str,
         analysis: dict,
         render_spec: RenderSpec,
         shader_code: str,
-    ) -> dict:
-        """Synchronous render implementation (called from a thread)."""
-        width, height = render_spec.export_settings.resolution
+    ) -> _FFmpegEncode:
+        """Render every frame into a new FFmpeg encode (render thread only).
+
+        Returns once the last frame is queued; the caller waits for the
+        encode with ``finish()``.  On failure FFmpeg is killed here.
+        """
+        out_width, out_height = render_spec.export_settings.resolution
         fps = render_spec.export_settings.fps
         duration = analysis.get("metadata", {}).get("duration", 60.0)
 
+        width, height = _shaded_resolution(render_spec.export_settings)
+
         output_dir = Path(settings.storage_path) / "renders"
         output_dir.mkdir(parents=True, exist_ok=True)
         output_path = output_dir / f"{render_id}.mp4"
 
         logger.info(
-            "Starting shader render: %s (%dx%d @ %dfps, %.1fs)",
-            render_id, width, height, fps, duration,
+            "Starting shader render: %s (%dx%d, shaded at %dx%d @ %dfps, %.1fs)",
+            render_id, out_width, out_height, width, height, fps, duration,
         )
 
         # Extract audio feature timeseries from analysis
@@ -537,44 +1088,58 @@ class ShaderRenderService:
         high_mid_values = band_data.get("high_mid", [])
         treble_values = band_data.get("treble", [])
 
-        # Create OpenGL context and compile shader.
-        # EGL is Linux-only; on Windows WGL is used automatically; on macOS CGL.
-        import sys
-        _backend_kwargs: dict = {}
-        if sys.platform.startswith("linux"):
-            _backend_kwargs["backend"] = "egl"
-        ctx = moderngl.create_standalone_context(**_backend_kwargs)
-        fbo = ctx.framebuffer(
-            color_attachments=[ctx.texture((width, height), 4)],
+        # Sample every audio feature for every frame up front instead of
+        # interpolating (and scanning all beats) inside the render loop
+        total_frames = int(duration * fps)
+        frame_times = np.arange(total_frames, dtype=np.float64) / fps
+        beat_env = _beat_envelope(beat_times, frame_times)
+        rms_env = (
+            _sample_series(spec_times, rms_values, frame_times) if rms_values
+            else np.full(total_frames, 0.3, dtype=np.float32)
+        )
+        centroid_env = (
+            _sample_series(spec_times, centroid_values, frame_times) if centroid_values
+            else np.full(total_frames, 0.5, dtype=np.float32)
+        )
+        bass_env = (
+            _sample_series(spec_times, bass_values, frame_times) if bass_values
+            else rms_env * 0.8
+        )
+        low_mid_env = (
+            _sample_series(spec_times, low_mid_values, frame_times) if low_mid_values
+            else rms_env * 0.6
+        )
+        mid_env = (
+            _sample_series(spec_times, mid_values, frame_times) if mid_values
+            else rms_env * 0.5
+        )
+        high_mid_env = (
+            _sample_series(spec_times, high_mid_values, frame_times) if high_mid_values
+            else rms_env * 0.4
+        )
+        treble_env = (
+            _sample_series(spec_times, treble_values, frame_times) if treble_values
+            else rms_env * 0.3
         )
 
+        # Reuse this thread's OpenGL context and framebuffer
+        ctx = self._get_ctx()
+        fbo = self._get_fbo(ctx, width, height)
+
         # Compile shader (already validated+retried in render_shader_video,
-        # but keep fallback as a safety net for context-specific failures)
-        frag_src = _FRAGMENT_WRAPPER.format(user_code=shader_code)
+        # but keep fallback as a safety net for context-specific failures).
+        # Programs stay cached on the context, so re-renders skip the compile.
         try:
-            prog = ctx.program(
-                vertex_shader=_VERTEX_SHADER,
-                fragment_shader=frag_src,
-            )
+            prog = self._get_program(ctx, _FRAGMENT_WRAPPER.substitute(user_code=shader_code))
         except Exception as e:
             logger.warning("Shader failed in render context, using fallback: %s", e)
-            frag_src = _FRAGMENT_WRAPPER.format(user_code=_FALLBACK_SHADER)
-            prog = ctx.program(
-                vertex_shader=_VERTEX_SHADER,
-                fragment_shader=frag_src,
-            )
+            prog = self._get_program(ctx, _FRAGMENT_WRAPPER.substitute(user_code=_FALLBACK_SHADER))
 
-        # Fullscreen quad (two triangles)
-        vertices = np.array([
-            -1.0, -1.0,
-             1.0, -1.0,
-            -1.0,  1.0,
-             1.0,  1.0,
-        ], dtype="f4")
-        vbo = ctx.buffer(vertices)
-        vao = ctx.vertex_array(prog, [(vbo, "2f", "in_position")])
-
-        # Set up FFmpeg to receive raw RGBA frames
+        # Set up FFmpeg to receive raw RGBA frames.  Drafts trade upscale
+        # quality for speed.
+        scale_flags = (
+            "fast_bilinear" if render_spec.export_settings.quality == "draft" else "bicubic"
+        )
         ffmpeg_cmd = [
             "ffmpeg", "-y",
             "-f", "rawvideo",
@@ -584,127 +1149,151 @@ class ShaderRenderService:
             "-r", str(fps),
             "-i", "pipe:0",
             "-i", str(audio_path),
-            "-c:v", "libx264",
-            "-preset", "fast",
-            "-crf", "21",
-            "-pix_fmt", "yuv420p",
+            *(
+                ["-vf", f"scale={out_width}:{out_height}:flags={scale_flags}"]
+                if (width, height) != (out_width, out_height) else []
+            ),
+            *_video_codec_args(_encoder_preset(render_spec.export_settings)),
             "-c:a", "aac",
             "-b:a", "192k",
-            "-movflags", "+faststart",
+            # Fragmented MP4: the moov atom is written up front, so there
+            # is no +faststart rewrite pass over the file after encoding.
+            # delay_moov waits for the first fragment so the B-frame delay
+            # lands in the edit list and video stays aligned with audio.
+            "-movflags", "+frag_keyframe+empty_moov+delay_moov+default_base_moof",
             "-shortest",
             str(output_path),
         ]
 
-        # Write FFmpeg stderr to a temp file instead of a pipe to avoid the
-        # classic subprocess deadlock: if the 64KB pipe buffer fills (FFmpeg
-        # writes lots of progress/stats), FFmpeg blocks on stderr writes and
-        # can never finish reading stdin → everything hangs.
-        stderr_file = tempfile.NamedTemporaryFile(
-            mode="w+b", suffix=".log", delete=False,
-        )
-        stderr_path = Path(stderr_file.name)
-
-        proc = subprocess.Popen(
-            ffmpeg_cmd,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.DEVNULL,
-            stderr=stderr_file,
-        )
-
-        total_frames = int(duration * fps)
+        # Small frames are batched so each pipe write is about as large as
+        # the pipe buffer; from ~512x512 up every batch is a single frame.
+        frame_bytes = width * height * 4
+        batch_frames = max(1, _PIPE_BUFFER_BYTES // frame_bytes)
+
+        # FFmpeg finalization timeout: after stdin closes it only has to
+        # encode the frames still buffered and mux the audio (no remux pass).
+        ffmpeg_timeout = max(60, int(duration))
+
+        # Everything below is created inside the try so a failure partway
+        # through setup still releases what was already allocated
+        encode: _FFmpegEncode | None = None
+        vbo: moderngl.Buffer | None = None
+        vao: moderngl.VertexArray | None = None
+        audio_ubo: moderngl.Buffer | None = None
+        pbos: list[moderngl.Buffer] = []
+        try:
+            vbo = ctx.buffer(_QUAD_VERTICES)
+            vao = ctx.vertex_array(prog, [(vbo, "2f", "in_position")])
 
-        # Scale FFmpeg finalization timeout: encoding overhead after all frames
-        # are piped depends on duration, resolution, and the faststart muxer pass.
-        ffmpeg_timeout = max(180, int(duration * 3) + 60)
+            encode = _FFmpegEncode(
+                ffmpeg_cmd, output_path, batch_frames * frame_bytes,
+                ffmpeg_timeout, render_id,
+            )
+            writer = encode.writer
+            # Readback goes through two pixel-pack buffers: frame N is read
+            # into one while frame N-1 is copied out of the other, so the
+            # GPU->CPU transfer overlaps the next draw.  Output lags the
+            # draw by one frame; the loop's extra iteration drains the last.
+            pbos = [ctx.buffer(reserve=frame_bytes) for _ in range(2)]
+            audio_ubo = ctx.buffer(reserve=_AUDIO_BLOCK_FLOATS * 4)
 
-        try:
             fbo.use()
             ctx.viewport = (0, 0, width, height)
+            # A single fullscreen quad needs no depth testing or culling
+            ctx.disable(moderngl.DEPTH_TEST | moderngl.CULL_FACE)
+
+            # Every frame's AudioUniforms contents, in block order; each
+            # row is uploaded with one write.  The block is optimized out
+            # (None) when the shader reads none of its members.
+            audio_rows = np.zeros((max(total_frames, 1), _AUDIO_BLOCK_FLOATS), dtype=np.float32)
+            audio_rows[:, 0] = width
+            audio_rows[:, 1] = height
+            audio_rows[:total_frames, 2:11] = np.column_stack([
+                frame_times, bass_env, low_mid_env, mid_env, high_mid_env,
+                treble_env, rms_env, beat_env, centroid_env,
+            ])
+            audio_block = prog.get("AudioUniforms", None)
+            if isinstance(audio_block, moderngl.UniformBlock):
+                audio_block.binding = 0
+                audio_ubo.bind_to_uniform_block(0)
+            # Warm-up draws (step calibration) see the first frame's values
+            audio_ubo.write(audio_rows[0])
+
+            member = prog.get("u_maxSteps", None)
+            u_max_steps = member if isinstance(member, moderngl.Uniform) else None
+            if u_max_steps is not None:
+                # A cached program may still hold an earlier render's
+                # reduced cap; always start from the shader's own default
+                if prog.extra is None:
+                    prog.extra = {"max_steps": u_max_steps.value}
+                u_max_steps.value = prog.extra["max_steps"]
+            budget_ms = settings.raymarch_frame_budget_ms
+            if u_max_steps is not None and budget_ms > 0:
+                steps = _calibrate_max_steps(ctx, vao, u_max_steps, budget_ms)
+                if steps is None:
+                    logger.warning(
+                        "Shader render %s: GL timer queries unusable on %s; "
+                        "ignoring the raymarch frame budget",
+                        render_id, ctx.info.get("GL_RENDERER", "this driver"),
+                    )
+                    steps = u_max_steps.value
+                elif steps < u_max_steps.value:
+                    logger.info(
+                        "Shader render %s: capping raymarch at %d steps to fit %.0f ms/frame",
+                        render_id, steps, budget_ms,
+                    )
+                u_max_steps.value = steps
+
+            batch_idx = 0
+            for frame_idx in range(total_frames + 1):
+                if frame_idx < total_frames:
+                    audio_ubo.write(audio_rows[frame_idx])
 
-            for frame_idx in range(total_frames):
-                t = frame_idx / fps
-
-                # Compute audio features at this time
-                rms = _interpolate(spec_times, rms_values, t) if rms_values else 0.3
-                centroid = _interpolate(spec_times, centroid_values, t) if centroid_values else 0.5
-                beat = _compute_beat_intensity(beat_times, t)
-
-                # Energy bands
-                bass = _interpolate(spec_times, bass_values, t) if bass_values else rms * 0.8
-                low_mid = _interpolate(spec_times, low_mid_values, t) if low_mid_values else rms * 0.6
-                mid = _interpolate(spec_times, mid_values, t) if mid_values else rms * 0.5
-                high_mid = _interpolate(spec_times, high_mid_values, t) if high_mid_values else rms * 0.4
-                treble = _interpolate(spec_times, treble_values, t) if treble_values else rms * 0.3
-
-                # Set uniforms (only set if they exist in the shader)
-                for name, value in [
-                    ("iTime", t),
-                    ("iResolution", (float(width), float(height))),
-                    ("u_bass", bass),
-                    ("u_lowMid", low_mid),
-                    ("u_mid", mid),
-                    ("u_highMid", high_mid),
-                    ("u_treble", treble),
-                    ("u_energy", rms),
-                    ("u_beat", beat),
-                    ("u_spectralCentroid", centroid),
-                ]:
-                    if name in prog:
-                        if isinstance(value, tuple):
-                            prog[name].value = value
-                        else:
-                            prog[name].value = value
-
-                # Render
-                ctx.clear(0.0, 0.0, 0.0, 1.0)
-                vao.render(moderngl.TRIANGLE_STRIP)
-
-                # Read pixels (bottom-to-top in OpenGL, need to flip)
-                raw = fbo.color_attachments[0].read()
-                # Flip vertically: OpenGL has origin at bottom-left
-                frame = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4)
-                frame = np.flipud(frame)
-                proc.stdin.write(frame.tobytes())
+                    # Render
+                    ctx.clear(0.0, 0.0, 0.0, 1.0)
+                    vao.render(moderngl.TRIANGLE_STRIP, vertices=4)
+
+                    # Start reading this frame into its pixel-pack buffer
+                    fbo.read_into(pbos[frame_idx & 1], components=4)
+
+                if frame_idx == 0:
+                    continue
+
+                # Copy the previous frame straight into its batch slot; the
+                # wrapper already renders rows top-down
+                if batch_idx == 0:
+                    batch = writer.acquire()
+                pbos[(frame_idx - 1) & 1].read_into(batch, write_offset=batch_idx * frame_bytes)
+                batch_idx += 1
+                if batch_idx == batch_frames:
+                    writer.submit(batch)
+                    batch_idx = 0
 
                 # Log progress periodically
                 if frame_idx % (fps * 10) == 0 and frame_idx > 0:
                     pct = int(frame_idx / total_frames * 100)
-                    logger.info("Shader render %s: %d%% (%d/%d frames)", render_id, pct, frame_idx, total_frames)
-
-        finally:
-            # Always release GL resources first (independent of FFmpeg)
-            vao.release()
-            vbo.release()
-            prog.release()
-            fbo.release()
-            ctx.release()
-
-            # Close FFmpeg stdin to signal end-of-stream, then wait
-            proc.stdin.close()
-            try:
-                proc.wait(timeout=ffmpeg_timeout)
-            except subprocess.TimeoutExpired:
-                logger.error(
-                    "FFmpeg timed out after %ds for render %s, killing",
-                    ffmpeg_timeout, render_id,
-                )
-                proc.kill()
-                proc.wait(timeout=10)
-                raise RuntimeError(
-                    f"FFmpeg encoding timed out after {ffmpeg_timeout}s"
-                )
-            finally:
-                stderr_file.close()
-
-            if proc.returncode != 0:
-                stderr_tail = stderr_path.read_text(errors="replace")[-500:]
-                logger.error("FFmpeg failed: %s", stderr_tail)
-                stderr_path.unlink(missing_ok=True)
-                raise RuntimeError(f"FFmpeg encoding failed (rc={proc.returncode})")
+                    logger.info(
+                        "Shader render %s: %d%% (%d/%d frames)",
+                        render_id, pct, frame_idx, total_frames,
+                    )
 
-            stderr_path.unlink(missing_ok=True)
+            # Flush the last, partially filled batch
+            if batch_idx:
+                writer.submit(batch, batch_idx * frame_bytes)
 
-        download_url = f"/storage/renders/{render_id}.mp4"
-        logger.info("Shader render complete: %s → %s", render_id, download_url)
+        except BaseException:
+            if encode is not None:
+                encode.abort()
+            raise
 
-        return {"download_url": download_url, "output_path": str(output_path)}
+        finally:
+            # Always release per-render GL resources (independent of
+            # FFmpeg); the context, framebuffer and program stay cached
+            resources: list[moderngl.VertexArray | moderngl.Buffer | None] = [
+                vao, vbo, *pbos, audio_ubo,
+            ]
+            for resource in resources:
+                if resource is not None:
+                    resource.release()
+
+        return encode
@@ -1,41 +1,104 @@
 """In-memory job store. Replace with Redis/DB in production."""
 
+import contextlib
+import sys
 import threading
+from collections import OrderedDict
 from typing import Any
 
+from app.config import settings
+
+# The lock-free paths below rely on the GIL making each OrderedDict
+# operation atomic; free-threaded builds (3.13t+) lock them instead
+_GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# Jobs in these states have work in flight and are never evicted.  Any
+# other job (finished, failed, or a queued edit request that nothing
+# picks up) may be dropped once it is among the least recently used.
+_ACTIVE_STATUSES = frozenset({"analyzing", "generating_shader", "rendering"})
+
 
 class JobStore:
     """Thread-safe in-memory job store.
 
     Production deployment should swap this for Redis-backed storage.
     The interface stays the same.
+
+    With the GIL, each get, set, pop, move and in-place merge is atomic,
+    so reads and single-job writes run without a lock.  Eviction, which
+    scans the store, always takes ``_lock``; on a free-threaded
+    interpreter every other operation takes it too.
+
+    At most ``max_jobs`` jobs are kept (0 means no limit).  Creating one
+    past the cap drops the least recently used idle jobs: ``get_job``
+    and ``update_job`` count as a use, so an uploaded song that renders
+    keep looking up stays.  Jobs still in progress are never evicted,
+    so the store may sit over the cap while many are running.
     """
 
-    def __init__(self) -> None:
-        self._jobs: dict[str, dict[str, Any]] = {}
+    def __init__(self, max_jobs: int = 0) -> None:
+        # Least recently used first
+        self._jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._max_jobs = max_jobs
         self._lock = threading.Lock()
+        self._op_lock: contextlib.AbstractContextManager[Any] = (
+            contextlib.nullcontext() if _GIL_ENABLED else self._lock
+        )
 
     def create_job(self, job_id: str, data: dict[str, Any]) -> None:
-        with self._lock:
+        with self._op_lock:
             self._jobs[job_id] = data
+            # Re-creating an existing id keeps its slot; count it as new
+            self._touch(job_id)
+        if self._max_jobs > 0 and len(self._jobs) > self._max_jobs:
+            with self._lock:
+                self._evict_idle()
+
+    def _touch(self, job_id: str) -> None:
+        """Mark a job as the most recently used."""
+        # A concurrent delete may have removed it since the caller's lookup
+        with contextlib.suppress(KeyError):
+            self._jobs.move_to_end(job_id)
+
+    def _evict_idle(self) -> None:
+        """Drop the least recently used idle jobs until the store fits the cap."""
+        excess = len(self._jobs) - self._max_jobs
+        if excess <= 0:
+            return
+        # list() snapshots atomically, so concurrent lock-free writers
+        # can't break the scan
+        idle = [
+            job_id
+            for job_id, job in list(self._jobs.items())
+            if job.get("status") not in _ACTIVE_STATUSES
+        ]
+        for job_id in idle[:excess]:
+            self._jobs.pop(job_id, None)
 
     def get_job(self, job_id: str) -> dict[str, Any] | None:
-        with self._lock:
-            return self._jobs.get(job_id)
+        with self._op_lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._touch(job_id)
+        return job
 
     def update_job(self, job_id: str, updates: dict[str, Any]) -> None:
-        with self._lock:
-            if job_id in self._jobs:
-                self._jobs[job_id].update(updates)
+        # A single lookup, so a concurrent delete can't raise KeyError; a
+        # racing create_job just means the merge lands on the old record
+        with self._op_lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job |= updates
+                self._touch(job_id)
 
     def delete_job(self, job_id: str) -> None:
-        with self._lock:
+        with self._op_lock:
             self._jobs.pop(job_id, None)
 
     def list_jobs(self) -> list[str]:
-        with self._lock:
-            return list(self._jobs.keys())
+        with self._op_lock:
+            return list(self._jobs)
 
 
 # Singleton instance
-job_store = JobStore()
+job_store = JobStore(settings.max_jobs)
@@ -5,6 +5,7 @@ from unittest.mock import AsyncMock, patch
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.render import _sanitize_render_spec
 from app.main import app
 from app.services.storage import job_store
 
@@ -144,3 +145,30 @@ class TestEditEndpoint:
         data = response.json()
         assert data["status"] == "queued"
         assert data["render_id"] != "r1"  # New ID created
+
+
+class TestSanitizeRenderSpec:
+    def test_valid_encoder_preset_kept(self):
+        spec = _sanitize_render_spec({"exportSettings": {"encoderPreset": "fast"}})
+        assert spec["exportSettings"]["encoderPreset"] == "fast"
+
+    @pytest.mark.parametrize("key", ["encoderPreset", "encoder_preset"])
+    def test_invalid_encoder_preset_dropped(self, key: str):
+        spec = _sanitize_render_spec({"exportSettings": {key: "placebo"}})
+        assert key not in spec["exportSettings"]
+
+    @pytest.mark.parametrize(
+        ("scale", "expected"), [(0.1, 0.25), (0.5, 0.5), (2, 1.0)],
+    )
+    def test_render_scale_clamped(self, scale: float, expected: float):
+        spec = _sanitize_render_spec({"exportSettings": {"renderScale": scale}})
+        assert spec["exportSettings"]["renderScale"] == expected
+
+    def test_snake_case_render_scale_clamped(self):
+        spec = _sanitize_render_spec({"export_settings": {"render_scale": 0.0}})
+        assert spec["export_settings"]["render_scale"] == 0.25
+
+    @pytest.mark.parametrize("scale", ["half", None])
+    def test_non_numeric_render_scale_dropped(self, scale: object):
+        spec = _sanitize_render_spec({"exportSettings": {"renderScale": scale}})
+        assert "renderScale" not in spec["exportSettings"]
@@ -7,11 +7,54 @@ from app.models.audio import RhythmAnalysis, SpectralAnalysis, EnergyBands, Tona
 from app.services.audio_analyzer import AudioAnalyzerService
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def analyzer():
     return AudioAnalyzerService()
 
 
+# Synthetic signals are built once per module; the analyzer never
+# mutates its input, so tests can share the buffers.
+_SR = 22050
+
+
+@pytest.fixture(scope="module")
+def click_track() -> np.ndarray:
+    """4 seconds of click pulses at 120 BPM (2 beats/sec)."""
+    y = np.zeros(int(_SR * 4.0))
+    beat_interval = int(_SR * 0.5)  # 120 BPM
+    # 100-sample click pulse at every beat, written in one indexed store
+    idx = np.arange(0, len(y), beat_interval)[:, None] + np.arange(100)
+    y[idx[idx < len(y)]] = 0.8
+    return y
+
+
+# Synthetic noise comes from seeded PCG64 generators, one per input, so
+# each input is the same whichever tests run and in whatever order
+
+# Mel spectrogram inputs for the energy-band tests: 128 mel bins
+_MEL_DB_RANDOM = np.random.default_rng(0).standard_normal((128, 50)).astype(np.float32)
+_MEL_DB_CONSTANT = np.full((128, 10), -20.0, dtype=np.float32)
+
+# Section-label features; _label_sections only reads them
+_EMPTY_FEATURES = np.zeros((25, 100), dtype=np.float32)
+_EMPTY_FEATURES.flags.writeable = False
+
+_EMPTY_BANDS = EnergyBands(bass=[], low_mid=[], mid=[], high_mid=[], treble=[])
+
+# Pure A4 tone (440 Hz), 2 seconds
+_A4 = np.sin(2 * np.pi * 440 * np.arange(_SR * 2, dtype=np.float32) / _SR)
+
+
+@pytest.fixture(scope="module")
+def noise_1s() -> np.ndarray:
+    return np.random.default_rng(1).standard_normal(_SR)
+
+
+@pytest.fixture(scope="module")
+def noise_2s() -> np.ndarray:
+    return np.random.default_rng(2).standard_normal(_SR * 2)
+
+
 class TestExtractMetadata:
     def test_extracts_extension(self, analyzer: AudioAnalyzerService):
         meta = analyzer._extract_metadata("song.mp3", 180.0, 22050)
@@ -31,134 +74,111 @@ class TestExtractMetadata:
 
 
 class TestExtractRhythm:
-    def test_produces_valid_output(self, analyzer: AudioAnalyzerService):
-        # Generate a click track at 120 BPM (2 beats/sec)
-        sr = 22050
-        duration = 4.0
-        y = np.zeros(int(sr * duration))
-        beat_interval = int(sr * 0.5)  # 120 BPM
-        for i in range(0, len(y), beat_interval):
-            y[i : i + 100] = 0.8  # Click pulse
-
-        rhythm = analyzer._extract_rhythm(y, sr)
+    def test_produces_valid_output(self, analyzer: AudioAnalyzerService, click_track: np.ndarray):
+        rhythm = analyzer._extract_rhythm(click_track, _SR)
         assert rhythm.bpm > 0
         assert 0 <= rhythm.bpm_confidence <= 1
         assert isinstance(rhythm.beats, list)
         assert isinstance(rhythm.downbeats, list)
         assert rhythm.time_signature == 4
 
-    def test_short_audio_few_beats(self, analyzer: AudioAnalyzerService):
-        sr = 22050
-        y = np.random.randn(sr)  # 1 second of noise
-        rhythm = analyzer._extract_rhythm(y, sr)
+    def test_short_audio_few_beats(self, analyzer: AudioAnalyzerService, noise_1s: np.ndarray):
+        rhythm = analyzer._extract_rhythm(noise_1s, _SR)
         # Should still produce some result, even if inaccurate
         assert rhythm.bpm > 0
         assert isinstance(rhythm.beats, list)
 
-    def test_downbeats_fallback_few_beats(self, analyzer: AudioAnalyzerService):
+    def test_downbeats_fallback_few_beats(self, analyzer: AudioAnalyzerService, noise_2s: np.ndarray):
         """When fewer than 4 beats, downbeats should use first beat."""
-        sr = 22050
-        y = np.random.randn(sr * 2)  # 2 seconds — may produce few beats
-        rhythm = analyzer._extract_rhythm(y, sr)
+        rhythm = analyzer._extract_rhythm(noise_2s, _SR)  # 2 seconds — may produce few beats
         assert isinstance(rhythm.downbeats, list)
 
 
 class TestComputeEnergyBands:
     def test_normalized_output(self, analyzer: AudioAnalyzerService):
-        mel_db = np.random.randn(128, 50)  # 128 mel bins, 50 frames
-        bands = analyzer._compute_energy_bands(mel_db)
+        bands = analyzer._compute_energy_bands(_MEL_DB_RANDOM)  # 50 frames
         # All bands should have values in [0, 1]
         for field in ["bass", "low_mid", "mid", "high_mid", "treble"]:
-            values = getattr(bands, field)
-            assert len(values) == 50
-            assert all(0 <= v <= 1 for v in values)
+            values = np.asarray(getattr(bands, field))
+            assert values.size == 50
+            assert ((values >= 0) & (values <= 1)).all(), np.flatnonzero((values < 0) | (values > 1))
 
     def test_constant_input(self, analyzer: AudioAnalyzerService):
         """When all values are equal, bands should be all 0 (max==min)."""
-        mel_db = np.ones((128, 10)) * -20.0
-        bands = analyzer._compute_energy_bands(mel_db)
-        assert all(v == 0.0 for v in bands.bass)
-        assert all(v == 0.0 for v in bands.treble)
+        bands = analyzer._compute_energy_bands(_MEL_DB_CONSTANT)
+        assert not np.any(bands.bass)
+        assert not np.any(bands.treble)
 
 
 class TestExtractTonal:
     def test_returns_valid_key(self, analyzer: AudioAnalyzerService):
-        sr = 22050
-        # Generate a pure A4 tone (440 Hz)
-        t = np.linspace(0, 2, sr * 2)
-        y = np.sin(2 * np.pi * 440 * t).astype(np.float32)
-        tonal = analyzer._extract_tonal(y, sr)
+        tonal = analyzer._extract_tonal(_A4, _SR)
         assert tonal.key in ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
         assert tonal.scale in ["major", "minor"]
         assert 0 <= tonal.key_confidence <= 1
         assert len(tonal.chromagram) == 12
 
 
+def _mood_inputs(
+    bpm: float, tempo_stable: bool, rms: list[float], key: str, scale: str,
+) -> tuple[RhythmAnalysis, SpectralAnalysis, TonalAnalysis]:
+    rhythm = RhythmAnalysis(
+        bpm=bpm, bpm_confidence=0.9, beats=[], downbeats=[], tempo_stable=tempo_stable,
+    )
+    spectral = SpectralAnalysis(
+        times=[], rms=rms, spectral_centroid=[], spectral_flux=[],
+        spectral_rolloff=[], mfcc=[], energy_bands=_EMPTY_BANDS,
+    )
+    tonal = TonalAnalysis(key=key, scale=scale, key_confidence=0.8, chromagram=[])
+    return rhythm, spectral, tonal
+
+
 class TestEstimateMood:
     def test_high_energy_major(self, analyzer: AudioAnalyzerService):
-        rhythm = RhythmAnalysis(bpm=120, bpm_confidence=0.9, beats=[], downbeats=[], tempo_stable=True)
-        spectral = SpectralAnalysis(
-            times=[], rms=[0.8, 0.9, 0.7], spectral_centroid=[], spectral_flux=[],
-            spectral_rolloff=[], mfcc=[], energy_bands=EnergyBands(bass=[], low_mid=[], mid=[], high_mid=[], treble=[]),
-        )
-        tonal = TonalAnalysis(key="C", scale="major", key_confidence=0.9, chromagram=[])
-        mood = analyzer._estimate_mood(rhythm, spectral, tonal)
+        mood = analyzer._estimate_mood(*_mood_inputs(120, True, [0.8, 0.9, 0.7], "C", "major"))
         assert mood.energy > 0.5
         assert mood.valence > 0
         assert "energetic" in mood.tags or "uplifting" in mood.tags
 
     def test_low_energy_minor(self, analyzer: AudioAnalyzerService):
-        rhythm = RhythmAnalysis(bpm=60, bpm_confidence=0.9, beats=[], downbeats=[], tempo_stable=False)
-        spectral = SpectralAnalysis(
-            times=[], rms=[0.05, 0.06], spectral_centroid=[], spectral_flux=[],
-            spectral_rolloff=[], mfcc=[], energy_bands=EnergyBands(bass=[], low_mid=[], mid=[], high_mid=[], treble=[]),
-        )
-        tonal = TonalAnalysis(key="A", scale="minor", key_confidence=0.8, chromagram=[])
-        mood = analyzer._estimate_mood(rhythm, spectral, tonal)
+        mood = analyzer._estimate_mood(*_mood_inputs(60, False, [0.05, 0.06], "A", "minor"))
         assert mood.energy < 0.5
         assert "calm" in mood.tags or "slow" in mood.tags
         assert "dark" in mood.tags
 
     def test_danceability_sweet_spot(self, analyzer: AudioAnalyzerService):
-        rhythm = RhythmAnalysis(bpm=115, bpm_confidence=0.9, beats=[], downbeats=[], tempo_stable=True)
-        spectral = SpectralAnalysis(
-            times=[], rms=[0.5], spectral_centroid=[], spectral_flux=[],
-            spectral_rolloff=[], mfcc=[], energy_bands=EnergyBands(bass=[], low_mid=[], mid=[], high_mid=[], treble=[]),
-        )
-        tonal = TonalAnalysis(key="G", scale="major", key_confidence=0.7, chromagram=[])
-        mood = analyzer._estimate_mood(rhythm, spectral, tonal)
+        mood = analyzer._estimate_mood(*_mood_inputs(115, True, [0.5], "G", "major"))
         assert mood.danceability >= 0.8  # 100-130 BPM + stable tempo
 
     def test_empty_rms(self, analyzer: AudioAnalyzerService):
-        rhythm = RhythmAnalysis(bpm=120, bpm_confidence=0.5, beats=[], downbeats=[])
-        spectral = SpectralAnalysis(
-            times=[], rms=[], spectral_centroid=[], spectral_flux=[],
-            spectral_rolloff=[], mfcc=[], energy_bands=EnergyBands(bass=[], low_mid=[], mid=[], high_mid=[], treble=[]),
-        )
-        tonal = TonalAnalysis(key="C", scale="major", key_confidence=0.5, chromagram=[])
-        mood = analyzer._estimate_mood(rhythm, spectral, tonal)
-        assert mood.energy == pytest.approx(min(1.0, 0.5 * 3.0), abs=0.01)  # np.mean([]) with fallback
+        mood = analyzer._estimate_mood(*_mood_inputs(120, True, [], "C", "major"))
+        # np.mean([]) with fallback
+        assert mood.energy == pytest.approx(min(1.0, 0.5 * 3.0), abs=0.01)
 
 
 class TestLabelSections:
     def test_intro_detection(self, analyzer: AudioAnalyzerService):
         boundaries = [0.0, 10.0, 60.0, 120.0]
-        labels = analyzer._label_sections(boundaries, 180.0, np.zeros((25, 100)), 22050)
+        labels = analyzer._label_sections(boundaries, 180.0, _EMPTY_FEATURES, 22050)
         assert labels[0] == "intro"  # Short first section
 
     def test_outro_detection(self, analyzer: AudioAnalyzerService):
         boundaries = [0.0, 30.0, 60.0, 160.0]
-        labels = analyzer._label_sections(boundaries, 180.0, np.zeros((25, 100)), 22050)
+        labels = analyzer._label_sections(boundaries, 180.0, _EMPTY_FEATURES, 22050)
         assert labels[-1] == "outro"  # position_ratio > 0.85
 
     def test_empty_boundaries(self, analyzer: AudioAnalyzerService):
-        labels = analyzer._label_sections([], 180.0, np.zeros((25, 100)), 22050)
+        labels = analyzer._label_sections([], 180.0, _EMPTY_FEATURES, 22050)
         assert labels == []
 
 
+_UNROUNDED = np.array([1.123456789, 2.987654321])
+_UNROUNDED.flags.writeable = False
+
+
 class TestToList:
-    def test_converts_and_rounds(self):
-        arr = np.array([1.123456789, 2.987654321])
-        result = AudioAnalyzerService._to_list(arr)
-        assert result == [1.12346, 2.98765]
-        assert all(isinstance(v, float) for v in result)
+    def test_rounds(self):
+        assert AudioAnalyzerService._to_list(_UNROUNDED) == [1.12346, 2.98765]
+
+    def test_returns_python_floats(self):
+        assert all(type(v) is float for v in AudioAnalyzerService._to_list(_UNROUNDED))
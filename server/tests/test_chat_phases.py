@@ -179,50 +179,47 @@ class TestPhaseTransition:
 class TestExtractRenderSpec:
     """Test _try_extract_render_spec from LLM text."""
 
-    def test_extracts_json_block(self) -> None:
-        text = """Here's the render spec:
-
-```json
-{"globalStyle": {"template": "nebula"}, "sections": [], "exportSettings": {}}
-```
-
-All done!"""
-        result = _try_extract_render_spec(text)
-        assert result is not None
-        assert result["globalStyle"]["template"] == "nebula"
-
-    def test_extracts_plain_json(self) -> None:
-        text = '{"globalStyle": {"template": "cinematic"}, "sections": []}'
+    @pytest.mark.parametrize(
+        ("text", "template"),
+        [
+            (
+                "Here's the render spec:\n\n"
+                "```json\n"
+                '{"globalStyle": {"template": "nebula"}, "sections": [], "exportSettings": {}}\n'
+                "```\n\n"
+                "All done!",
+                "nebula",
+            ),
+            ('{"globalStyle": {"template": "cinematic"}, "sections": []}', "cinematic"),
+            ('```\n{"globalStyle": {"template": "retro"}, "sections": []}\n```', "retro"),
+        ],
+        ids=["json_block", "plain_json", "untagged_code_block"],
+    )
+    def test_extracts_spec(self, text: str, template: str) -> None:
         result = _try_extract_render_spec(text)
         assert result is not None
-        assert result["globalStyle"]["template"] == "cinematic"
-
-    def test_returns_none_for_no_json(self) -> None:
-        text = "Here are some suggestions for your visualization..."
-        result = _try_extract_render_spec(text)
-        assert result is None
-
-    def test_returns_none_for_invalid_json(self) -> None:
-        text = '{"globalStyle": {broken json'
-        result = _try_extract_render_spec(text)
-        assert result is None
+        assert result["globalStyle"]["template"] == template
 
-    def test_extracts_code_block_without_json_tag(self) -> None:
-        text = """```
-{"globalStyle": {"template": "retro"}, "sections": []}
-```"""
-        result = _try_extract_render_spec(text)
-        assert result is not None
-        assert result["globalStyle"]["template"] == "retro"
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Here are some suggestions for your visualization...",
+            '{"globalStyle": {broken json',
+        ],
+        ids=["no_json", "invalid_json"],
+    )
+    def test_returns_none(self, text: str) -> None:
+        assert _try_extract_render_spec(text) is None
 
 
 class TestBuildAnalysisContext:
     """Test context building from job store data."""
 
-    def setup_method(self) -> None:
-        # Clear the job store between tests
-        for jid in list(job_store._jobs.keys()):
-            job_store.delete_job(jid)
+    @pytest.fixture(autouse=True)
+    def clean_job_store(self):
+        job_store._jobs.clear()
+        yield
+        job_store._jobs.clear()
 
     def test_empty_when_job_not_found(self) -> None:
         assert _build_analysis_context("nonexistent") == ""
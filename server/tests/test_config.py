@@ -46,5 +46,9 @@ class TestSettings:
         assert s.redis_url == "redis://localhost:6379/0"
         assert s.storage_backend == "local"
         assert s.max_upload_size_mb == 50
+        assert s.max_jobs == 1000
         assert s.google_ai_api_key == ""
         assert s.genius_api_token == ""
+        assert s.nvidia_compat_check is True
+        assert s.video_encoder == "libx264"
+        assert s.raymarch_frame_budget_ms == 0.0
@@ -1,11 +1,71 @@
 """Tests for LLM service — validates the google-genai SDK integration."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
 
 import pytest
 
 from app.models.chat import ChatMessage
-from app.services.llm_service import LLMService, SYSTEM_PROMPT, RENDER_SPEC_EXTRACTION_PROMPT
+from app.services.llm_service import (
+    RENDER_SPEC_EXTRACTION_PROMPT,
+    SYSTEM_PROMPT,
+    LLMService,
+    sanitize_shader_code,
+)
+
+
+class _FakeChat:
+    """Stand-in for a google-genai async chat session."""
+
+    def __init__(self, chunks: tuple[str, ...] = (), response_text: str = "") -> None:
+        self._chunks = chunks
+        self._response = SimpleNamespace(text=response_text)
+
+    async def send_message_stream(self, message: str):
+        async def stream():
+            for text in self._chunks:
+                yield SimpleNamespace(text=text)
+
+        return stream()
+
+    async def send_message(self, message: str):
+        return self._response
+
+
+class _FakeClient:
+    """Stand-in for ``genai.Client``; records the kwargs of ``aio.chats.create``."""
+
+    def __init__(self, chat: _FakeChat | None = None, error: Exception | None = None) -> None:
+        self._chat = chat
+        self._error = error
+        self.create_kwargs: dict | None = None
+        self.aio = SimpleNamespace(chats=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs) -> _FakeChat | None:
+        if self._error is not None:
+            raise self._error
+        self.create_kwargs = kwargs
+        return self._chat
+
+
+class _FakeGenai:
+    """Stand-in for the ``google.genai`` module; records ``Client`` calls."""
+
+    def __init__(self) -> None:
+        self.client = _FakeClient()
+        self.client_calls: list[dict] = []
+
+    def Client(self, **kwargs) -> _FakeClient:  # noqa: N802 - mirrors genai.Client
+        self.client_calls.append(kwargs)
+        return self.client
+
+
+@pytest.fixture
+def fake_genai(monkeypatch: pytest.MonkeyPatch) -> _FakeGenai:
+    """Patch the service's genai module and give it an API key."""
+    fake = _FakeGenai()
+    monkeypatch.setattr("app.services.llm_service.genai", fake)
+    monkeypatch.setattr("app.services.llm_service.settings.google_ai_api_key", "test-key")
+    return fake
 
 
 class TestLLMServiceInit:
@@ -15,41 +75,24 @@ class TestLLMServiceInit:
         service = LLMService()
         assert service._client is None
 
-    @patch("app.services.llm_service.settings")
-    def test_raises_without_api_key(self, mock_settings: MagicMock) -> None:
-        mock_settings.google_ai_api_key = ""
+    def test_raises_without_api_key(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr("app.services.llm_service.settings.google_ai_api_key", "")
         service = LLMService()
         with pytest.raises(RuntimeError, match="GOOGLE_AI_API_KEY is not set"):
             service._get_client()
 
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    def test_creates_client_with_api_key(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-        mock_genai.Client.return_value = MagicMock()
+    def test_creates_client_with_api_key(self, fake_genai: _FakeGenai) -> None:
         service = LLMService()
         client = service._get_client()
-        mock_genai.Client.assert_called_once_with(api_key="test-key")
-        assert client is not None
-
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    def test_reuses_client(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-        mock_genai.Client.return_value = MagicMock()
+        assert fake_genai.client_calls == [{"api_key": "test-key"}]
+        assert client is fake_genai.client
+
+    def test_reuses_client(self, fake_genai: _FakeGenai) -> None:
         service = LLMService()
         client1 = service._get_client()
         client2 = service._get_client()
         assert client1 is client2
-        assert mock_genai.Client.call_count == 1
+        assert len(fake_genai.client_calls) == 1
 
 
 class TestStreamChat:
@@ -64,37 +107,8 @@ class TestStreamChat:
         assert any("need a message" in c for c in chunks)
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_streams_response(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
-        # Set up the mock chain: client.aio.chats.create() -> chat -> send_message_stream()
-        mock_chunk1 = MagicMock()
-        mock_chunk1.text = "Hello "
-        mock_chunk2 = MagicMock()
-        mock_chunk2.text = "world!"
-
-        async def mock_async_iter():
-            for chunk in [mock_chunk1, mock_chunk2]:
-                yield chunk
-
-        mock_chat = MagicMock()
-        mock_chat.send_message_stream = AsyncMock(return_value=mock_async_iter())
-
-        mock_chats = MagicMock()
-        mock_chats.create.return_value = mock_chat
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+    async def test_streams_response(self, fake_genai: _FakeGenai) -> None:
+        fake_genai.client = _FakeClient(_FakeChat(chunks=("Hello ", "world!")))
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test message")]
@@ -106,24 +120,8 @@ class TestStreamChat:
         assert chunks == ["Hello ", "world!"]
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_yields_error_on_exception(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
-        mock_chats = MagicMock()
-        mock_chats.create.side_effect = Exception("API down")
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+    async def test_yields_error_on_exception(self, fake_genai: _FakeGenai) -> None:
+        fake_genai.client = _FakeClient(error=Exception("API down"))
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test")]
@@ -135,32 +133,8 @@ class TestStreamChat:
         assert any("error" in c.lower() for c in chunks)
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_audio_context_prepended(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
-        async def mock_async_iter():
-            chunk = MagicMock()
-            chunk.text = "response"
-            yield chunk
-
-        mock_chat = MagicMock()
-        mock_chat.send_message_stream = AsyncMock(return_value=mock_async_iter())
-
-        mock_chats = MagicMock()
-        mock_chats.create.return_value = mock_chat
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+    async def test_audio_context_prepended(self, fake_genai: _FakeGenai) -> None:
+        client = fake_genai.client = _FakeClient(_FakeChat(chunks=("response",)))
 
         service = LLMService()
         messages = [
@@ -174,11 +148,7 @@ class TestStreamChat:
             chunks.append(chunk)
 
         # Verify history was created with audio context in first message
-        create_call = mock_chats.create.call_args
-        history = create_call.kwargs.get("history") or create_call.args[0] if create_call.args else None
-        if history is None and "history" in (create_call.kwargs or {}):
-            history = create_call.kwargs["history"]
-
+        history = client.create_kwargs["history"]
         assert history is not None
         # First message in history should contain the audio context
         first_text = history[0].parts[0].text
@@ -190,31 +160,9 @@ class TestExtractRenderSpec:
     """Test extract_render_spec method."""
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_extracts_valid_json(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
+    async def test_extracts_valid_json(self, fake_genai: _FakeGenai) -> None:
         spec_json = '{"globalStyle": {"template": "nebula"}, "sections": [], "exportSettings": {}}'
-        mock_response = MagicMock()
-        mock_response.text = spec_json
-
-        mock_chat = MagicMock()
-        mock_chat.send_message = AsyncMock(return_value=mock_response)
-
-        mock_chats = MagicMock()
-        mock_chats.create.return_value = mock_chat
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+        fake_genai.client = _FakeClient(_FakeChat(response_text=spec_json))
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test")]
@@ -224,31 +172,9 @@ class TestExtractRenderSpec:
         assert result["globalStyle"]["template"] == "nebula"
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_strips_markdown_fences(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
+    async def test_strips_markdown_fences(self, fake_genai: _FakeGenai) -> None:
         spec_json = '```json\n{"globalStyle": {"template": "cinematic"}}\n```'
-        mock_response = MagicMock()
-        mock_response.text = spec_json
-
-        mock_chat = MagicMock()
-        mock_chat.send_message = AsyncMock(return_value=mock_response)
-
-        mock_chats = MagicMock()
-        mock_chats.create.return_value = mock_chat
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+        fake_genai.client = _FakeClient(_FakeChat(response_text=spec_json))
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test")]
@@ -258,30 +184,10 @@ class TestExtractRenderSpec:
         assert result["globalStyle"]["template"] == "cinematic"
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_returns_none_on_invalid_json(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
-        mock_response = MagicMock()
-        mock_response.text = "This is not valid JSON at all"
-
-        mock_chat = MagicMock()
-        mock_chat.send_message = AsyncMock(return_value=mock_response)
-
-        mock_chats = MagicMock()
-        mock_chats.create.return_value = mock_chat
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+    async def test_returns_none_on_invalid_json(self, fake_genai: _FakeGenai) -> None:
+        fake_genai.client = _FakeClient(
+            _FakeChat(response_text="This is not valid JSON at all"),
+        )
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test")]
@@ -290,24 +196,8 @@ class TestExtractRenderSpec:
         assert result is None
 
     @pytest.mark.asyncio
-    @patch("app.services.llm_service.genai")
-    @patch("app.services.llm_service.settings")
-    async def test_returns_none_on_api_error(
-        self,
-        mock_settings: MagicMock,
-        mock_genai: MagicMock,
-    ) -> None:
-        mock_settings.google_ai_api_key = "test-key"
-
-        mock_chats = MagicMock()
-        mock_chats.create.side_effect = Exception("API error")
-
-        mock_aio = MagicMock()
-        mock_aio.chats = mock_chats
-
-        mock_client = MagicMock()
-        mock_client.aio = mock_aio
-        mock_genai.Client.return_value = mock_client
+    async def test_returns_none_on_api_error(self, fake_genai: _FakeGenai) -> None:
+        fake_genai.client = _FakeClient(error=Exception("API error"))
 
         service = LLMService()
         messages = [ChatMessage(role="user", content="test")]
@@ -319,22 +209,54 @@ class TestExtractRenderSpec:
 class TestSystemPrompt:
     """Verify the system prompt contains all required phase instructions."""
 
-    def test_contains_analysis_phase(self) -> None:
-        assert "Phase: ANALYSIS" in SYSTEM_PROMPT
-
-    def test_contains_refinement_phase(self) -> None:
-        assert "Phase: REFINEMENT" in SYSTEM_PROMPT
-
-    def test_contains_confirmation_phase(self) -> None:
-        assert "Phase: CONFIRMATION" in SYSTEM_PROMPT
-
-    def test_contains_editing_phase(self) -> None:
-        assert "Phase: EDITING" in SYSTEM_PROMPT
-
-    def test_contains_render_spec_schema(self) -> None:
-        assert "globalStyle" in SYSTEM_PROMPT
-        assert "sections" in SYSTEM_PROMPT
-        assert "exportSettings" in SYSTEM_PROMPT
+    def test_contains_phase_and_schema_markers(self) -> None:
+        markers = (
+            "Phase: ANALYSIS",
+            "Phase: REFINEMENT",
+            "Phase: CONFIRMATION",
+            "Phase: EDITING",
+            "globalStyle",
+            "sections",
+            "exportSettings",
+        )
+        missing = [m for m in markers if m not in SYSTEM_PROMPT]
+        assert not missing
 
     def test_extraction_prompt_exists(self) -> None:
         assert "render spec" in RENDER_SPEC_EXTRACTION_PROMPT.lower()
+
+
+class TestSanitizeFragCoord:
+    """``gl_FragCoord`` in mainImage is rewritten to the coord argument."""
+
+    def test_swizzles_use_argument(self) -> None:
+        code = sanitize_shader_code(
+            "void mainImage(out vec4 fragColor, in vec2 p) {\n"
+            "    vec2 uv = gl_FragCoord.xy / iResolution.xy;\n"
+            "    fragColor = vec4(uv, gl_FragCoord.y, gl_FragCoord.yx);\n"
+            "}"
+        )
+        assert "vec2 uv = p / iResolution.xy;" in code
+        assert "vec4(uv, p.y, p.yx)" in code
+
+    def test_other_uses_keep_depth(self) -> None:
+        code = sanitize_shader_code(
+            "void mainImage(out vec4 fragColor, in vec2 fragCoord) {\n"
+            "    fragColor = gl_FragCoord * gl_FragCoord.z;\n"
+            "}"
+        )
+        expected = "vec4(fragCoord, gl_FragCoord.zw) * vec4(fragCoord, gl_FragCoord.zw).z"
+        assert expected in code
+
+    def test_helpers_and_nested_blocks(self) -> None:
+        code = sanitize_shader_code(
+            "float row() { return gl_FragCoord.y; }\n"
+            "void mainImage(out vec4 fragColor, in vec2 fragCoord) {\n"
+            "    if (row() > 0.0) { fragColor = vec4(gl_FragCoord.x); }\n"
+            "    fragColor.g = gl_FragCoord.y;\n"
+            "}"
+        )
+        # Helpers have no coord argument in scope, so they are left alone
+        assert "float row() { return gl_FragCoord.y; }" in code
+        assert "vec4(fragCoord.x)" in code
+        assert "fragColor.g = fragCoord.y;" in code
@@ -5,48 +5,38 @@ import pytest
 from app.services.lyrics_service import LyricsService
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def service():
     return LyricsService()
 
 
 class TestParseGeniusLyrics:
-    def test_basic_lyrics(self, service: LyricsService):
-        raw = "Song Title Lyrics\n[Verse 1]\nFirst line\nSecond line\n\n[Chorus]\nChorus line\n123Embed"
-        lines = service._parse_genius_lyrics(raw)
-        texts = [line.text for line in lines]
-
-        assert "[Verse 1]" in texts
-        assert "First line" in texts
-        assert "Second line" in texts
-        assert "[Chorus]" in texts
-        assert "Chorus line" in texts
-        # Header and Embed footer should be removed
-        assert "Song Title Lyrics" not in texts
-        assert "123Embed" not in texts
-
-    def test_empty_lyrics(self, service: LyricsService):
-        lines = service._parse_genius_lyrics("")
-        assert lines == []
-
-    def test_no_header_no_embed(self, service: LyricsService):
-        raw = "Hello world\nSecond line"
-        lines = service._parse_genius_lyrics(raw)
-        assert len(lines) == 2
-        assert lines[0].text == "Hello world"
-
-    def test_contributors_header_removed(self, service: LyricsService):
-        raw = "5 ContributorsSong Lyrics\nActual line"
-        lines = service._parse_genius_lyrics(raw)
-        texts = [line.text for line in lines]
-        assert "Actual line" in texts
-        assert len(lines) == 1
-
-    def test_embed_footer_removed(self, service: LyricsService):
-        raw = "Line one\nLine two\nEmbed"
-        lines = service._parse_genius_lyrics(raw)
-        texts = [line.text for line in lines]
-        assert "Embed" not in texts
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            (
+                "Song Title Lyrics\n[Verse 1]\nFirst line\nSecond line\n\n[Chorus]\nChorus line\n123Embed",
+                ["[Verse 1]", "First line", "Second line", "[Chorus]", "Chorus line"],
+            ),
+            ("", []),
+            ("Hello world\nSecond line", ["Hello world", "Second line"]),
+            ("5 ContributorsSong Lyrics\nActual line", ["Actual line"]),
+            ("Line one\nLine two\nEmbed", ["Line one", "Line two"]),
+            ("Line one\nEmbedded", ["Line one", "Embedded"]),
+            ("Line one\n\n\nLine two\n\n", ["Line one", "Line two"]),
+        ],
+        ids=[
+            "header_and_embed_removed",
+            "empty",
+            "no_header_no_embed",
+            "contributors_header_removed",
+            "embed_footer_removed",
+            "embed_prefix_kept",
+            "empty_lines_skipped",
+        ],
+    )
+    def test_line_texts(self, service: LyricsService, raw: str, expected: list[str]):
+        assert [line.text for line in service._parse_genius_lyrics(raw)] == expected
 
     def test_words_split_correctly(self, service: LyricsService):
         raw = "Hello beautiful world"
@@ -66,11 +56,6 @@ class TestParseGeniusLyrics:
                 assert word.start_time == 0.0
                 assert word.end_time == 0.0
 
-    def test_empty_lines_skipped(self, service: LyricsService):
-        raw = "Line one\n\n\nLine two\n\n"
-        lines = service._parse_genius_lyrics(raw)
-        assert len(lines) == 2
-
 
 class TestFetchLyrics:
     @pytest.mark.asyncio
@@ -41,11 +41,10 @@ class TestRhythmAnalysis:
         r = RhythmAnalysis(bpm=120, bpm_confidence=1.0, beats=[], downbeats=[])
         assert r.bpm_confidence == 1.0
 
-    def test_confidence_out_of_range_raises(self):
+    @pytest.mark.parametrize("confidence", [1.5, -0.1])
+    def test_confidence_out_of_range_raises(self, confidence: float):
         with pytest.raises(ValidationError):
-            RhythmAnalysis(bpm=120, bpm_confidence=1.5, beats=[], downbeats=[])
-        with pytest.raises(ValidationError):
-            RhythmAnalysis(bpm=120, bpm_confidence=-0.1, beats=[], downbeats=[])
+            RhythmAnalysis(bpm=120, bpm_confidence=confidence, beats=[], downbeats=[])
 
     def test_defaults(self):
         r = RhythmAnalysis(bpm=100, bpm_confidence=0.5, beats=[], downbeats=[])
@@ -60,21 +59,20 @@ class TestMoodAnalysis:
         assert m.valence == -0.5
         assert m.energy == 0.8
 
-    def test_valence_out_of_range(self):
-        with pytest.raises(ValidationError):
-            MoodAnalysis(valence=-1.5, energy=0.5, danceability=0.5, tags=[])
-        with pytest.raises(ValidationError):
-            MoodAnalysis(valence=1.5, energy=0.5, danceability=0.5, tags=[])
-
-    def test_energy_out_of_range(self):
-        with pytest.raises(ValidationError):
-            MoodAnalysis(valence=0, energy=-0.1, danceability=0.5, tags=[])
-        with pytest.raises(ValidationError):
-            MoodAnalysis(valence=0, energy=1.1, danceability=0.5, tags=[])
-
-    def test_danceability_out_of_range(self):
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"valence": -1.5},
+            {"valence": 1.5},
+            {"energy": -0.1},
+            {"energy": 1.1},
+            {"danceability": -0.1},
+        ],
+        ids=["valence_low", "valence_high", "energy_low", "energy_high", "danceability_low"],
+    )
+    def test_out_of_range_raises(self, overrides: dict):
         with pytest.raises(ValidationError):
-            MoodAnalysis(valence=0, energy=0.5, danceability=-0.1, tags=[])
+            MoodAnalysis(**{"valence": 0, "energy": 0.5, "danceability": 0.5, "tags": [], **overrides})
 
     def test_boundary_values(self):
         m = MoodAnalysis(valence=-1.0, energy=0.0, danceability=0.0, tags=[])
@@ -93,22 +91,27 @@ class TestTonalAnalysis:
             TonalAnalysis(key="C", scale="major", key_confidence=1.5, chromagram=[])
 
 
+@pytest.fixture(scope="module")
+def full_result_dump() -> dict:
+    """A fully populated AudioAnalysisResult, dumped once for the module."""
+    result = AudioAnalysisResult(
+        metadata=AudioMetadata(filename="test.mp3", duration=180.0, sample_rate=22050, channels=1, format="mp3"),
+        rhythm=RhythmAnalysis(bpm=120, bpm_confidence=0.9, beats=[0.5, 1.0], downbeats=[0.5]),
+        sections=SectionData(boundaries=[0.0, 60.0], labels=["intro", "verse"], confidence=[0.8, 0.7], similarities=[[1.0, 0.3], [0.3, 1.0]]),
+        spectral=SpectralAnalysis(times=[0.0], rms=[0.5], spectral_centroid=[2000.0], spectral_flux=[0.1], spectral_rolloff=[8000.0], mfcc=[[0.1]], energy_bands=EnergyBands(bass=[0.8], low_mid=[0.5], mid=[0.4], high_mid=[0.3], treble=[0.2])),
+        tonal=TonalAnalysis(key="C", scale="major", key_confidence=0.85, chromagram=[[0.5] * 12]),
+        mood=MoodAnalysis(valence=0.3, energy=0.7, danceability=0.6, tags=["energetic"]),
+        onsets=[0.5, 1.0, 1.5],
+        harmonic_percussive=HarmonicPercussive(harmonic_energy=[0.4], percussive_energy=[0.3]),
+    )
+    return result.model_dump()
+
+
 class TestAudioAnalysisResult:
-    def test_full_model_serialization(self):
-        result = AudioAnalysisResult(
-            metadata=AudioMetadata(filename="test.mp3", duration=180.0, sample_rate=22050, channels=1, format="mp3"),
-            rhythm=RhythmAnalysis(bpm=120, bpm_confidence=0.9, beats=[0.5, 1.0], downbeats=[0.5]),
-            sections=SectionData(boundaries=[0.0, 60.0], labels=["intro", "verse"], confidence=[0.8, 0.7], similarities=[[1.0, 0.3], [0.3, 1.0]]),
-            spectral=SpectralAnalysis(times=[0.0], rms=[0.5], spectral_centroid=[2000.0], spectral_flux=[0.1], spectral_rolloff=[8000.0], mfcc=[[0.1]], energy_bands=EnergyBands(bass=[0.8], low_mid=[0.5], mid=[0.4], high_mid=[0.3], treble=[0.2])),
-            tonal=TonalAnalysis(key="C", scale="major", key_confidence=0.85, chromagram=[[0.5] * 12]),
-            mood=MoodAnalysis(valence=0.3, energy=0.7, danceability=0.6, tags=["energetic"]),
-            onsets=[0.5, 1.0, 1.5],
-            harmonic_percussive=HarmonicPercussive(harmonic_energy=[0.4], percussive_energy=[0.3]),
-        )
-        data = result.model_dump()
-        assert data["metadata"]["filename"] == "test.mp3"
-        assert data["rhythm"]["bpm"] == 120
-        assert len(data["onsets"]) == 3
+    def test_full_model_serialization(self, full_result_dump: dict):
+        assert full_result_dump["metadata"]["filename"] == "test.mp3"
+        assert full_result_dump["rhythm"]["bpm"] == 120
+        assert len(full_result_dump["onsets"]) == 3
 
 
 # ── Lyrics Models ─────────────────────────────────────────────
@@ -158,11 +161,10 @@ class TestRenderModels:
         assert s.transition_in == "cross-dissolve"
         assert s.visual_elements == []
 
-    def test_section_spec_intensity_validation(self):
+    @pytest.mark.parametrize("intensity", [1.5, -0.1])
+    def test_section_spec_intensity_validation(self, intensity: float):
         with pytest.raises(ValidationError):
-            SectionSpec(label="x", start_time=0, end_time=10, intensity=1.5)
-        with pytest.raises(ValidationError):
-            SectionSpec(label="x", start_time=0, end_time=10, intensity=-0.1)
+            SectionSpec(label="x", start_time=0, end_time=10, intensity=intensity)
 
     def test_section_spec_intensity_bounds(self):
         s = SectionSpec(label="x", start_time=0, end_time=10, intensity=0.0)
@@ -177,14 +179,26 @@ class TestRenderModels:
         assert e.aspect_ratio == "16:9"
         assert e.format == "mp4"
         assert e.quality == "high"
-
-    def test_export_settings_invalid_fps(self):
+        assert e.encoder_preset is None
+        assert e.render_scale == 1.0
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"fps": 25},  # Not in Literal[24, 30, 60]
+            {"encoder_preset": "placebo"},
+            {"render_scale": 0.0},
+            {"render_scale": 1.5},
+            {"aspect_ratio": "4:3"},
+        ],
+        ids=["fps", "encoder_preset", "render_scale_low", "render_scale_high", "aspect_ratio"],
+    )
+    def test_export_settings_invalid(self, kwargs: dict):
         with pytest.raises(ValidationError):
-            ExportSettings(fps=25)  # Not in Literal[24, 30, 60]
+            ExportSettings(**kwargs)
 
-    def test_export_settings_invalid_aspect_ratio(self):
-        with pytest.raises(ValidationError):
-            ExportSettings(aspect_ratio="4:3")
+    def test_export_settings_render_scale_in_bounds(self):
+        assert ExportSettings(render_scale=0.5).render_scale == 0.5
 
     def test_global_style_defaults(self):
         g = GlobalStyle()
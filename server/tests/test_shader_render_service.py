@@ -0,0 +1,565 @@
+"""Tests for the ShaderRenderService helpers — audio timeseries and static checks."""
+
+import asyncio
+import io
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.models.render import ExportSettings, RenderSpec
+from app.services import shader_render_service
+from app.services.llm_service import sanitize_shader_code
+from app.services.shader_render_service import (
+    _FALLBACK_LIBRARY,
+    _FALLBACK_SPHERE,
+    _FALLBACK_TUNNEL,
+    _FALLBACK_WAVES,
+    ShaderRenderService,
+    _beat_envelope,
+    _calibrate_max_steps,
+    _encoder_preset,
+    _FFmpegEncode,
+    _FrameWriter,
+    _sample_series,
+    _shaded_resolution,
+    pick_fallback_shader,
+    run_on_compile_thread,
+    run_on_render_thread,
+)
+
+
+class TestBeatEnvelope:
+    def test_decays_from_last_beat(self):
+        frame_times = np.array([0.0, 0.5, 0.65, 1.15, 2.0, 3.0])
+        env = _beat_envelope([0.5, 1.0, 3.0], frame_times)
+        # One decay constant (0.15 s) after a beat the envelope is 1/e
+        expected = [0.0, 1.0, np.exp(-1), np.exp(-1), np.exp(-1.0 / 0.15), 1.0]
+        assert env.dtype == np.float32
+        assert env == pytest.approx(expected, abs=1e-6)
+
+    def test_zero_before_first_beat(self):
+        env = _beat_envelope([1.0], np.array([0.0, 0.5, 0.99]))
+        assert env.tolist() == [0.0, 0.0, 0.0]
+
+    def test_one_on_beat(self):
+        env = _beat_envelope([1.0, 2.0], np.array([1.0, 2.0]))
+        assert env.tolist() == [1.0, 1.0]
+
+    def test_unsorted_beats(self):
+        frame_times = np.linspace(0, 3, 50)
+        env = _beat_envelope([2.5, 0.5, 1.5], frame_times)
+        assert env == pytest.approx(_beat_envelope([0.5, 1.5, 2.5], frame_times))
+
+    def test_no_beats(self):
+        env = _beat_envelope([], np.arange(10) / 30)
+        assert env.shape == (10,)
+        assert not env.any()
+
+
+class TestSampleSeries:
+    def test_interpolates_between_samples(self):
+        times = [0.0, 0.5, 1.25, 2.0]
+        values = [0.1, 0.9, 0.4, 0.7]
+        frame_times = np.array([-1.0, 0.0, 0.25, 0.5, 1.0, 2.0, 3.0])
+        # Held at the ends; 1.0 s is two thirds of the way from 0.9 to 0.4
+        expected = [0.1, 0.1, 0.5, 0.9, 0.9 - 0.5 * 2 / 3, 0.7, 0.7]
+        env = _sample_series(times, values, frame_times)
+        assert env.dtype == np.float32
+        assert env == pytest.approx(expected, abs=1e-6)
+
+    def test_mismatched_lengths_truncated(self):
+        env = _sample_series([0.0, 1.0, 2.0], [0.0, 1.0], np.array([0.5, 3.0]))
+        assert env.tolist() == [0.5, 1.0]
+
+    def test_empty_times(self):
+        env = _sample_series([], [0.5, 0.6], np.arange(4) / 30)
+        assert env.tolist() == [0.0] * 4
+
+
+class TestNvidiaStaticCheck:
+    def test_gate_runs_on_mesa(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService, "_gl_vendor", "Mesa")
+        assert ShaderRenderService._needs_nvidia_static_check() is True
+
+    def test_gate_skips_on_nvidia(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService, "_gl_vendor", "NVIDIA Corporation")
+        assert ShaderRenderService._needs_nvidia_static_check() is False
+
+    def test_gate_disabled_by_setting(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService, "_gl_vendor", "Mesa")
+        monkeypatch.setattr(settings, "nvidia_compat_check", False)
+        assert ShaderRenderService._needs_nvidia_static_check() is False
+
+    def test_fallbacks_are_clean_after_sanitize(self):
+        from app.services.llm_service import sanitize_shader_code
+
+        for _, shader in _FALLBACK_LIBRARY:
+            assert ShaderRenderService._nvidia_static_check(sanitize_shader_code(shader)) is None
+
+    def test_void_expression(self):
+        err = ShaderRenderService._nvidia_static_check("    void(x);")
+        assert err is not None
+        assert "line 1" in err
+
+    def test_void_declaration_allowed(self):
+        assert ShaderRenderService._nvidia_static_check("void main() {}") is None
+        assert ShaderRenderService._nvidia_static_check("float f(void) {") is None
+
+    def test_return_void(self):
+        err = ShaderRenderService._nvidia_static_check("{\n    return void;\n}")
+        assert err is not None
+        assert "line 2" in err
+
+    def test_func_void_call(self):
+        assert ShaderRenderService._nvidia_static_check("x = foo(void);") is not None
+
+    def test_comment_lines_skipped(self):
+        assert ShaderRenderService._nvidia_static_check("// void(x);") is None
+
+    def test_hash_declaration(self):
+        err = ShaderRenderService._nvidia_static_check("float hash(vec2 p) {")
+        assert err is not None
+        assert "hashFn" in err
+
+
+class TestVideoCodecArgs:
+    def test_default_libx264(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "libx264")
+        args = shader_render_service._video_codec_args("veryfast")
+        assert args[:4] == ["-c:v", "libx264", "-preset", "veryfast"]
+
+    def test_libx264_skips_probe(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "libx264")
+        probe = MagicMock()
+        monkeypatch.setattr(shader_render_service, "_ffmpeg_encoders", probe)
+        shader_render_service._video_codec_args("veryfast")
+        probe.assert_not_called()
+
+    def test_nvenc_when_available(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "h264_nvenc")
+        monkeypatch.setattr(
+            shader_render_service, "_ffmpeg_encoders", lambda: frozenset({"h264_nvenc"}),
+        )
+        monkeypatch.setattr(shader_render_service, "_encoder_works", lambda name: True)
+        args = shader_render_service._video_codec_args("veryfast")
+        assert args[:2] == ["-c:v", "h264_nvenc"]
+
+    def test_listed_nvenc_failing_trial_falls_back(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "h264_nvenc")
+        monkeypatch.setattr(
+            shader_render_service, "_ffmpeg_encoders", lambda: frozenset({"h264_nvenc"}),
+        )
+        monkeypatch.setattr(shader_render_service, "_encoder_works", lambda name: False)
+        args = shader_render_service._video_codec_args("fast")
+        assert args[:4] == ["-c:v", "libx264", "-preset", "fast"]
+
+    def test_auto_picks_available_hardware(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "auto")
+        monkeypatch.setattr(
+            shader_render_service, "_ffmpeg_encoders", lambda: frozenset({"libx264", "h264_qsv"}),
+        )
+        monkeypatch.setattr(shader_render_service, "_encoder_works", lambda name: True)
+        args = shader_render_service._video_codec_args("veryfast")
+        assert args[:2] == ["-c:v", "h264_qsv"]
+        assert args[-2:] == ["-pix_fmt", "nv12"]
+
+    def test_auto_skips_encoder_failing_trial(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "auto")
+        monkeypatch.setattr(
+            shader_render_service, "_ffmpeg_encoders",
+            lambda: frozenset({"h264_nvenc", "h264_qsv"}),
+        )
+        monkeypatch.setattr(
+            shader_render_service, "_encoder_works", lambda name: name == "h264_qsv",
+        )
+        args = shader_render_service._video_codec_args("veryfast")
+        assert args[:2] == ["-c:v", "h264_qsv"]
+
+    def test_auto_without_hardware_uses_libx264(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "auto")
+        monkeypatch.setattr(
+            shader_render_service, "_ffmpeg_encoders", lambda: frozenset({"libx264"}),
+        )
+        args = shader_render_service._video_codec_args("veryfast")
+        assert args[:2] == ["-c:v", "libx264"]
+
+    def test_nvenc_missing_falls_back(self, monkeypatch):
+        monkeypatch.setattr(settings, "video_encoder", "h264_nvenc")
+        monkeypatch.setattr(shader_render_service, "_ffmpeg_encoders", lambda: frozenset())
+        args = shader_render_service._video_codec_args("fast")
+        assert args[:4] == ["-c:v", "libx264", "-preset", "fast"]
+
+
+class TestEncoderWorks:
+    @pytest.mark.parametrize(("returncode", "works"), [(0, True), (1, False)])
+    def test_trial_encode_result(self, monkeypatch, returncode, works):
+        run = MagicMock(return_value=MagicMock(returncode=returncode, stderr="no device"))
+        monkeypatch.setattr(shader_render_service.subprocess, "run", run)
+        assert shader_render_service._encoder_works.__wrapped__("h264_nvenc") is works
+        cmd = run.call_args.args[0]
+        assert cmd[cmd.index("-c:v") + 1] == "h264_nvenc"
+
+    def test_missing_ffmpeg(self, monkeypatch):
+        monkeypatch.setattr(
+            shader_render_service.subprocess, "run", MagicMock(side_effect=FileNotFoundError),
+        )
+        assert shader_render_service._encoder_works.__wrapped__("h264_qsv") is False
+
+
+class TestCalibrateMaxSteps:
+    def _ctx(self, frame_ms, renderer="NVIDIA GeForce RTX 3060/PCIe/SSE2"):
+        ctx = MagicMock()
+        ctx.info = {"GL_RENDERER": renderer}
+        ctx.query.return_value.elapsed = int(frame_ms * 1e6)
+        return ctx
+
+    def test_within_budget_keeps_default(self):
+        steps = _calibrate_max_steps(self._ctx(5), MagicMock(), MagicMock(value=80), 10.0)
+        assert steps == 80
+
+    def test_scales_down_to_budget(self):
+        steps = _calibrate_max_steps(self._ctx(20), MagicMock(), MagicMock(value=80), 10.0)
+        assert steps == 40
+
+    def test_clamped_to_minimum(self):
+        steps = _calibrate_max_steps(self._ctx(1000), MagicMock(), MagicMock(value=80), 10.0)
+        assert steps == shader_render_service._MIN_RAYMARCH_STEPS
+
+    def test_software_renderer_skipped(self):
+        ctx = self._ctx(20, renderer="llvmpipe (LLVM 15.0.7, 256 bits)")
+        assert _calibrate_max_steps(ctx, MagicMock(), MagicMock(value=80), 10.0) is None
+        ctx.query.assert_not_called()
+
+    def test_unrecorded_query_skipped(self):
+        ctx = self._ctx(20)
+        ctx.query.return_value.elapsed = 0xFFFFFFFF
+        assert _calibrate_max_steps(ctx, MagicMock(), MagicMock(value=80), 10.0) is None
+
+
+class TestShadedResolution:
+    def test_full_scale(self):
+        assert _shaded_resolution(ExportSettings(resolution=(1920, 1080))) == (1920, 1080)
+
+    def test_render_scale(self):
+        es = ExportSettings(resolution=(1920, 1080), render_scale=0.25)
+        assert _shaded_resolution(es) == (480, 270)
+
+    def test_draft_capped_at_half(self):
+        es = ExportSettings(resolution=(1920, 1080), quality="draft")
+        assert _shaded_resolution(es) == (960, 540)
+        es = ExportSettings(resolution=(1920, 1080), quality="draft", render_scale=0.25)
+        assert _shaded_resolution(es) == (480, 270)
+
+
+class TestEncoderPreset:
+    def test_default_follows_quality(self):
+        assert _encoder_preset(ExportSettings()) == "veryfast"
+        assert _encoder_preset(ExportSettings(quality="standard")) == "superfast"
+        assert _encoder_preset(ExportSettings(quality="draft")) == "ultrafast"
+
+    def test_explicit_preset_wins(self):
+        assert _encoder_preset(ExportSettings(quality="draft", encoder_preset="medium")) == "medium"
+
+
+class _BrokenPipe:
+    def write(self, data):
+        raise BrokenPipeError("ffmpeg exited")
+
+
+class TestFrameWriter:
+    def test_pipe_error_surfaces_on_next_submit(self):
+        writer = _FrameWriter(_BrokenPipe(), buffer_bytes=4)
+        writer.submit(writer.acquire())
+        writer.close()
+        assert isinstance(writer.error, BrokenPipeError)
+        with pytest.raises(BrokenPipeError):
+            writer.submit(writer.acquire())
+
+    def test_pooled_buffers_are_recycled(self):
+        stream = io.BytesIO()
+        writer = _FrameWriter(stream, buffer_bytes=4, max_pending=2)
+        seen = set()
+        for i in range(6):
+            buf = writer.acquire()
+            seen.add(id(buf))
+            buf[:] = i
+            writer.submit(buf)
+        writer.close()
+        assert stream.getvalue() == b"".join(bytes([i]) * 4 for i in range(6))
+        assert writer.error is None
+        assert len(seen) == 2
+
+    def test_partial_submit(self):
+        stream = io.BytesIO()
+        writer = _FrameWriter(stream, buffer_bytes=8)
+        buf = writer.acquire()
+        buf[:] = 7
+        writer.submit(buf, 3)
+        writer.close()
+        assert stream.getvalue() == b"\x07" * 3
+
+
+class TestCompileCache:
+    @pytest.fixture(autouse=True)
+    def _empty_caches(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService._gl_local, "programs", {}, raising=False)
+        ShaderRenderService._gl_compile_error.cache_clear()
+        yield
+        ShaderRenderService._gl_compile_error.cache_clear()
+
+    def test_repeat_compile_hits_cache(self, monkeypatch):
+        ctx = MagicMock()
+        monkeypatch.setattr(ShaderRenderService, "_get_ctx", classmethod(lambda cls: ctx))
+        code = _FALLBACK_LIBRARY[0][1]
+        assert ShaderRenderService._try_compile(code) is None
+        assert ShaderRenderService._try_compile(code) is None
+        assert ctx.program.call_count == 1
+
+    def test_validated_program_stays_cached(self, monkeypatch):
+        ctx = MagicMock()
+        monkeypatch.setattr(ShaderRenderService, "_get_ctx", classmethod(lambda cls: ctx))
+        code = _FALLBACK_LIBRARY[0][1]
+        assert ShaderRenderService._try_compile(code) is None
+        frag_src = shader_render_service._FRAGMENT_WRAPPER.substitute(
+            user_code=sanitize_shader_code(code),
+        )
+        prog = ShaderRenderService._get_program(ctx, frag_src)
+        assert ctx.program.call_count == 1
+        prog.release.assert_not_called()
+
+    def test_compile_error_is_returned(self, monkeypatch):
+        ctx = MagicMock()
+        ctx.program.side_effect = RuntimeError("GLSL Compiler failed")
+        monkeypatch.setattr(ShaderRenderService, "_get_ctx", classmethod(lambda cls: ctx))
+        assert ShaderRenderService._try_compile("void mainImage() {}") == "GLSL Compiler failed"
+
+
+class TestProgramCache:
+    @pytest.fixture(autouse=True)
+    def _empty_cache(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService._gl_local, "programs", {}, raising=False)
+
+    def test_same_source_compiles_once(self):
+        ctx = MagicMock()
+        first = ShaderRenderService._get_program(ctx, "src")
+        assert ShaderRenderService._get_program(ctx, "src") is first
+        assert ctx.program.call_count == 1
+
+    def test_oldest_evicted_when_full(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService, "_PROGRAM_CACHE_SIZE", 2)
+        ctx = MagicMock()
+        ctx.program.side_effect = lambda **kw: MagicMock()
+        oldest = ShaderRenderService._get_program(ctx, "a")
+        ShaderRenderService._get_program(ctx, "b")
+        ShaderRenderService._get_program(ctx, "c")
+        oldest.release.assert_called_once()
+        assert list(ShaderRenderService._gl_local.programs) == ["b", "c"]
+
+
+class TestFboCache:
+    @pytest.fixture(autouse=True)
+    def _empty_cache(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService._gl_local, "fbos", {}, raising=False)
+
+    def test_same_size_reused(self):
+        ctx = MagicMock()
+        first = ShaderRenderService._get_fbo(ctx, 64, 32)
+        assert ShaderRenderService._get_fbo(ctx, 64, 32) is first
+        assert ctx.framebuffer.call_count == 1
+
+    def test_oldest_released_when_full(self, monkeypatch):
+        monkeypatch.setattr(ShaderRenderService, "_FBO_CACHE_SIZE", 2)
+        ctx = MagicMock()
+        ctx.framebuffer.side_effect = lambda **kw: MagicMock(
+            color_attachments=kw["color_attachments"],
+        )
+        ctx.texture.side_effect = lambda *a: MagicMock()
+        oldest = ShaderRenderService._get_fbo(ctx, 1, 1)
+        ShaderRenderService._get_fbo(ctx, 2, 2)
+        ShaderRenderService._get_fbo(ctx, 3, 3)
+        oldest.release.assert_called_once()
+        oldest.color_attachments[0].release.assert_called_once()
+        assert list(ShaderRenderService._gl_local.fbos) == [(2, 2), (3, 3)]
+
+
+class TestGlThreads:
+    @pytest.mark.asyncio
+    async def test_each_pool_uses_one_thread(self):
+        def name():
+            return threading.current_thread().name
+
+        compile_names = {await run_on_compile_thread(name) for _ in range(3)}
+        render_names = {await run_on_render_thread(name) for _ in range(3)}
+        assert len(compile_names) == 1
+        assert len(render_names) == 1
+        assert compile_names.pop().startswith("shader-compile")
+        assert render_names.pop().startswith("shader-render")
+
+    @pytest.mark.asyncio
+    async def test_compile_check_not_queued_behind_render(self):
+        release = threading.Event()
+        render = asyncio.ensure_future(run_on_render_thread(release.wait, 5))
+        try:
+            assert await asyncio.wait_for(run_on_compile_thread(lambda: "ok"), 1) == "ok"
+            assert not render.done()
+        finally:
+            release.set()
+            assert await render is True
+
+
+class TestFFmpegEncode:
+    def test_finish_after_clean_exit(self, tmp_path):
+        encode = _FFmpegEncode(["cat"], tmp_path / "out.mp4", 4, 10, "r1")
+        buf = encode.writer.acquire()
+        buf[:] = 1
+        encode.writer.submit(buf)
+        encode.finish()
+
+    def test_finish_raises_on_failure(self, tmp_path):
+        encode = _FFmpegEncode(["sh", "-c", "exit 3"], tmp_path / "out.mp4", 4, 10, "r1")
+        with pytest.raises(RuntimeError, match="rc=3"):
+            encode.finish()
+
+    def test_abort_discards_output(self, tmp_path):
+        output = tmp_path / "out.mp4"
+        output.write_bytes(b"partial")
+        encode = _FFmpegEncode(["sleep", "30"], output, 4, 10, "r1")
+        encode.abort()
+        assert not output.exists()
+
+
+class TestRenderSetupFailure:
+    def test_popen_failure_releases_resources(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "storage_path", str(tmp_path))
+        ctx = MagicMock()
+        monkeypatch.setattr(ShaderRenderService, "_get_ctx", classmethod(lambda cls: ctx))
+        monkeypatch.setattr(ShaderRenderService, "_get_fbo", MagicMock())
+        monkeypatch.setattr(ShaderRenderService, "_get_program", MagicMock())
+        monkeypatch.setattr(
+            shader_render_service.subprocess, "Popen", MagicMock(side_effect=OSError("no ffmpeg")),
+        )
+        stderr_files = []
+        named_temp = shader_render_service.tempfile.NamedTemporaryFile
+
+        def record_temp(**kw):
+            f = named_temp(dir=tmp_path, **kw)
+            stderr_files.append(Path(f.name))
+            return f
+
+        monkeypatch.setattr(shader_render_service.tempfile, "NamedTemporaryFile", record_temp)
+
+        service = ShaderRenderService()
+        with pytest.raises(OSError, match="no ffmpeg"):
+            service._render_frames(
+                "r1", "song.mp3", {"metadata": {"duration": 1.0}}, RenderSpec(), "void main() {}",
+            )
+        # Only the quad buffers exist yet; both are released
+        ctx.buffer.return_value.release.assert_called_once()
+        ctx.vertex_array.return_value.release.assert_called_once()
+        assert not stderr_files[0].exists()
+
+
+# Encodes where each pixel sits and which per-frame uniforms it saw
+_PROBE_SHADER = """\
+void mainImage(out vec4 fragColor, in vec2 fragCoord) {
+    fragColor = vec4(fragCoord.y / iResolution.y, u_bass, u_spectralCentroid, iTime);
+}
+"""
+
+
+@pytest.fixture(scope="module")
+def gl_available():
+    try:
+        ShaderRenderService._get_ctx()
+    except Exception as e:
+        pytest.skip(f"No headless GL context: {e}")
+
+
+class TestRenderFrames:
+    """Renders real frames, with FFmpeg swapped for ``cat`` to capture them."""
+
+    def _capture_frames(self, monkeypatch, tmp_path, shader, resolution, quality):
+        """Render 3 frames of ``shader`` and return them as (frame, row, col, rgba)."""
+        monkeypatch.setattr(settings, "storage_path", str(tmp_path))
+        monkeypatch.setattr(settings, "video_encoder", "libx264")
+        monkeypatch.setattr(settings, "raymarch_frame_budget_ms", 0)
+        raw_path = tmp_path / "frames.raw"
+        real_popen = shader_render_service.subprocess.Popen
+
+        def capture(cmd, **kw):
+            return real_popen(["cat"], **{**kw, "stdout": raw_path.open("wb")})
+
+        monkeypatch.setattr(shader_render_service.subprocess, "Popen", capture)
+
+        analysis = {
+            "metadata": {"duration": 0.1},  # 3 frames
+            "spectral": {
+                "times": [0.0, 0.1],
+                "spectral_centroid": [0.5, 0.5],
+                "energy_bands": {"bass": [0.0, 0.3]},
+            },
+        }
+        spec = RenderSpec(export_settings=ExportSettings(resolution=resolution, quality=quality))
+        encode = ShaderRenderService()._render_frames("r1", "song.mp3", analysis, spec, shader)
+        encode.finish()
+        return np.frombuffer(raw_path.read_bytes(), dtype=np.uint8)
+
+    @pytest.mark.parametrize(
+        ("resolution", "quality", "shaded"),
+        [
+            ((64, 32), "high", (64, 32)),
+            ((100, 60), "draft", (50, 30)),
+            ((640, 480), "high", (640, 480)),
+        ],
+    )
+    def test_frames_reach_encoder(
+        self, gl_available, monkeypatch, tmp_path, resolution, quality, shaded,
+    ):
+        frames = self._capture_frames(monkeypatch, tmp_path, _PROBE_SHADER, resolution, quality)
+
+        fps = 30
+        width, height = shaded
+        assert frames.size == 3 * height * width * 4
+        frames = frames.reshape(3, height, width, 4).astype(int)
+
+        # Rows arrive top-down: row r was shaded at Shadertoy y = height - r - 0.5
+        expected_red = np.round((height - np.arange(height) - 0.5) / height * 255)
+        for frame in frames:
+            assert np.abs(frame[:, :, 0] - expected_red[:, None]).max() <= 1
+            assert np.abs(frame[:, :, 2] - 128).max() <= 1
+        # Per-frame uniforms: bass ramps 0 -> 0.3 over 0.1 s, iTime = i / fps
+        for i, frame in enumerate(frames):
+            assert np.abs(frame[:, :, 1] - round(i / fps / 0.1 * 0.3 * 255)).max() <= 1
+            assert np.abs(frame[:, :, 3] - round(i / fps * 255)).max() <= 1
+
+    def test_sanitized_gl_fragcoord_matches_fragcoord(self, gl_available, monkeypatch, tmp_path):
+        # The browser preview passes gl_FragCoord.xy as fragCoord, so both must agree
+        direct = _PROBE_SHADER.replace("fragCoord.y", "gl_FragCoord.y")
+        sanitized = sanitize_shader_code(direct)
+        assert "gl_FragCoord" not in sanitized
+
+        expected = self._capture_frames(monkeypatch, tmp_path, _PROBE_SHADER, (64, 32), "high")
+        frames = self._capture_frames(monkeypatch, tmp_path, sanitized, (64, 32), "high")
+        assert np.array_equal(frames, expected)
+
+
+class TestPickFallbackShader:
+    def test_keyword_match(self):
+        assert pick_fallback_shader("A glowing ORB over the sea") is _FALLBACK_SPHERE
+
+    def test_substring_match(self):
+        assert pick_fallback_shader("hyperspace tunnels") is _FALLBACK_TUNNEL
+
+    def test_library_order_wins(self):
+        # "ocean" (waves) and "portal" (tunnel): tunnel comes first
+        assert pick_fallback_shader("an ocean portal") is _FALLBACK_TUNNEL
+
+    def test_no_keywords_returns_library_shader(self):
+        assert pick_fallback_shader("abstract") in {shader for _, shader in _FALLBACK_LIBRARY}
+
+    def test_waves(self):
+        assert pick_fallback_shader("fluid motion") is _FALLBACK_WAVES
@@ -1,10 +1,21 @@
 """Tests for the in-memory job store."""
 
 import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
 
 from app.services.storage import JobStore
 
 
+@pytest.fixture(scope="module")
+def pool():
+    # Worker threads are reused by every concurrency test in the module;
+    # keep max_workers >= the largest barrier party count below
+    with ThreadPoolExecutor(max_workers=18) as executor:
+        yield executor
+
+
 class TestJobStore:
     def setup_method(self):
         self.store = JobStore()
@@ -54,22 +65,131 @@ class TestJobStore:
         assert job is not None
         assert job["version"] == 2
 
-    def test_thread_safety(self):
+    def test_max_jobs_drops_least_recently_used(self):
+        store = JobStore(max_jobs=3)
+        for i in range(3):
+            store.create_job(f"j{i}", {"status": "complete"})
+        store.get_job("j0")
+        store.update_job("j1", {"percentage": 100})
+        store.create_job("j3", {"status": "complete"})
+        # j2 is the only one not used since it was created
+        assert store.list_jobs() == ["j0", "j1", "j3"]
+
+    def test_upload_used_by_renders_survives_cap(self):
+        store = JobStore(max_jobs=3)
+        store.create_job("upload", {"status": "complete", "analysis": {}})
+        for i in range(10):
+            # Each render start looks up the audio job before creating its own
+            assert store.get_job("upload") is not None
+            store.create_job(f"render-{i}", {"status": "complete"})
+        assert store.list_jobs() == ["render-8", "upload", "render-9"]
+
+    def test_max_jobs_keeps_running_jobs(self):
+        store = JobStore(max_jobs=2)
+        store.create_job("running", {"status": "rendering"})
+        store.create_job("failed", {"status": "error"})
+        store.create_job("analyzing", {"status": "analyzing"})
+        # The idle job goes first; in-progress ones survive
+        assert store.list_jobs() == ["running", "analyzing"]
+        store.create_job("shader", {"status": "generating_shader"})
+        # Nothing idle is left to drop, so the store sits over the cap
+        assert store.list_jobs() == ["running", "analyzing", "shader"]
+        store.update_job("running", {"status": "complete"})
+        store.create_job("next", {"status": "rendering"})
+        assert store.list_jobs() == ["analyzing", "shader", "next"]
+
+    def test_queued_edit_jobs_are_evictable(self):
+        store = JobStore(max_jobs=2)
+        for i in range(5):
+            store.create_job(f"edit-{i}", {"type": "render_edit", "status": "queued"})
+        assert store.list_jobs() == ["edit-3", "edit-4"]
+
+    def test_no_limit_by_default(self):
+        for i in range(50):
+            self.store.create_job(f"j{i}", {})
+        assert len(self.store.list_jobs()) == 50
+
+    def test_thread_safety(self, pool: ThreadPoolExecutor):
         """Verify concurrent access doesn't corrupt state."""
-        errors: list[Exception] = []
+        # Release all writers at once so their inserts actually interleave
+        barrier = threading.Barrier(4)
 
         def writer(job_id: str):
-            try:
-                for i in range(100):
-                    self.store.create_job(f"{job_id}_{i}", {"val": i})
-            except Exception as e:
-                errors.append(e)
-
-        threads = [threading.Thread(target=writer, args=(f"t{t}",)) for t in range(4)]
-        for t in threads:
-            t.start()
-        for t in threads:
-            t.join()
-
-        assert len(errors) == 0
+            barrier.wait(timeout=5)
+            for i in range(100):
+                self.store.create_job(f"{job_id}_{i}", {"val": i})
+
+        # result() re-raises anything a worker hit
+        for future in [pool.submit(writer, f"t{t}") for t in range(4)]:
+            future.result()
+
         assert len(self.store.list_jobs()) == 400
+
+    def test_concurrent_readers(self, pool: ThreadPoolExecutor):
+        """Readers polling jobs alongside writers never see a partial job."""
+        for i in range(50):
+            self.store.create_job(f"j{i}", {"status": "new", "progress": 0})
+        # Every reader and writer starts together, so they really overlap
+        barrier = threading.Barrier(18)
+
+        def reader():
+            barrier.wait(timeout=5)
+            for _ in range(20):
+                for i in range(50):
+                    job = self.store.get_job(f"j{i}")
+                    assert job is not None
+                    assert "status" in job and "progress" in job
+
+        def writer(offset: int):
+            barrier.wait(timeout=5)
+            for step in range(200):
+                self.store.update_job(f"j{(step + offset) % 50}", {"progress": step})
+
+        futures = [pool.submit(reader) for _ in range(16)]
+        futures += [pool.submit(writer, w * 25) for w in range(2)]
+        for future in futures:
+            future.result()
+
+        assert len(self.store.list_jobs()) == 50
+
+    def test_concurrent_creates_with_cap(self, pool: ThreadPoolExecutor):
+        """Eviction from several writers at once neither raises nor overshoots."""
+        store = JobStore(max_jobs=5)
+        barrier = threading.Barrier(4)
+
+        def writer(w: int):
+            barrier.wait(timeout=5)
+            for i in range(200):
+                store.create_job(f"t{w}_{i}", {"status": "complete"})
+
+        for future in [pool.submit(writer, w) for w in range(4)]:
+            future.result()
+
+        assert len(store.list_jobs()) == 5
+
+    def test_concurrent_updates_keep_every_key(self, pool: ThreadPoolExecutor):
+        """Lock-free merges into one job never drop another writer's keys."""
+        self.store.create_job("j1", {"status": "new"})
+        barrier = threading.Barrier(4)
+
+        def writer(w: int):
+            barrier.wait(timeout=5)
+            for i in range(100):
+                self.store.update_job("j1", {f"w{w}_{i}": i})
+
+        for future in [pool.submit(writer, w) for w in range(4)]:
+            future.result()
+
+        job = self.store.get_job("j1")
+        assert job is not None
+        assert len(job) == 1 + 4 * 100
+
+    def test_locks_without_gil(self, monkeypatch):
+        monkeypatch.setattr("app.services.storage._GIL_ENABLED", False)
+        store = JobStore(max_jobs=1)
+        assert store._op_lock is store._lock
+        store.create_job("j1", {"status": "new"})
+        store.update_job("j1", {"status": "updated"})
+        assert store.get_job("j1") == {"status": "updated"}
+        store.create_job("j2", {"status": "new"})
+        assert store.list_jobs() == ["j2"]